@@ -1,5 +1,7 @@
 from math import sqrt
 
+from chain import StrikeIndex
+
 def pivot_sr(H, B, C):
     """
     Pivot = (H + B + C) / 3
@@ -36,8 +38,13 @@ def deviation(close, volatility, period, precision=0):
         'sd': sd_period,
     }
 
-def atm(price, options):
-    strikes = [o.strike for o in options]
-    atm = round(price / 25, 0) * 25
-    doptions = dict(zip(strikes, options))
-    return doptions[atm]
+def atm(price, options, index=None):
+    """Option of options with the strike nearest to price
+
+    :param: index `chain.StrikeIndex` of the strikes of options, to reuse
+            between calls on the same options
+    """
+    options = list(options)
+    if index is None:
+        index = StrikeIndex([o.strike for o in options])
+    return options[index.nearest(price)]
@@ -0,0 +1,83 @@
+"""Exact analytics of payoffs at expiry, without price grid.
+
+A strategy made of options is piecewise linear in the price at expiry,
+with kinks only at its strikes: its extrema are at price 0, at a strike
+or unbounded on the right, and its breakevens are found segment by
+segment. Every function works on a batch of N strategies of L legs,
+given as (N, L) arrays (legs padded with a weight of 0).
+"""
+import numpy as np
+
+
+def kink_payoff(strike, sign, weight, cost):
+    """Prices (N, L+1) where the payoff can change slope, price 0 and the
+    sorted strikes, and the payoff (N, L+1) at these prices
+
+    The strikes are sorted once and the payoff integrated segment by
+    segment from its value at 0: crossing a strike adds the weight of the
+    leg to the slope, whether a call or a put. O(L log L) per strategy.
+
+    :param: strike (N, L) strike of each leg, >= 0
+    :param: sign (N, L) +1 for a call, -1 for a put
+    :param: weight (N, L) signed quantity times multiplier, > 0 for long
+    :param: cost (N,) cost of each strategy
+    """
+    strike = np.asarray(strike, dtype=float)
+    sign = np.asarray(sign, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    order = np.argsort(strike, axis=1)
+    sorted_strike = np.take_along_axis(strike, order, axis=1)
+    points = np.concatenate([np.zeros((len(strike), 1)), sorted_strike], axis=1)
+    # pente juste après 0 : les puts de strike > 0 et les calls de strike 0
+    first = np.where(sign > 0, strike <= 0, -1.0 * (strike > 0)) * weight
+    change = np.take_along_axis(np.where(strike > 0, weight, 0.0), order, axis=1)
+    slopes = first.sum(axis=1)[:, None] + np.concatenate(
+        [np.zeros((len(strike), 1)), np.cumsum(change, axis=1)[:, :-1]], axis=1)
+    at_zero = (np.maximum(-sign * strike, 0) * weight).sum(axis=1) - np.asarray(cost, dtype=float)
+    payoff = np.concatenate([at_zero[:, None], np.diff(points, axis=1) * slopes], axis=1)
+    return points, np.cumsum(payoff, axis=1)
+
+
+def right_slope(sign, weight):
+    """Slope of the payoff above the highest strike: the calls only"""
+    return np.where(sign > 0, weight, 0).sum(axis=1)
+
+
+def payoff_analytics(strike, sign, weight, cost):
+    """Exact max profit, max loss and breakevens of N strategies
+
+    Return a dict of arrays:
+    - max_profit (N,), inf when unbounded
+    - max_loss (N,), the minimum of the payoff, -inf when unbounded
+    - breakevens (N, L+2) sorted prices where the payoff is 0, NaN padded
+    - points, payoff (N, L+1) payoff at price 0 and at every strike
+    """
+    sign = np.asarray(sign, dtype=float)
+    weight = np.asarray(weight, dtype=float)
+    points, payoff = kink_payoff(strike, sign, weight, cost)
+    slope = right_slope(sign, weight)
+    max_profit = np.where(slope > 0, np.inf, payoff.max(axis=1))
+    max_loss = np.where(slope < 0, -np.inf, payoff.min(axis=1))
+
+    x0, x1 = points[:, :-1], points[:, 1:]
+    y0, y1 = payoff[:, :-1], payoff[:, 1:]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        crossing = np.where(y0 * y1 < 0, x0 + (x1 - x0) * y0 / (y0 - y1), np.nan)
+        last = payoff[:, -1]
+        beyond = points[:, -1] - last / slope
+    crossing = np.where(payoff[:, 1:] == 0, x1, crossing)
+    beyond = np.where(last * slope < 0, beyond, np.nan)
+    at_zero = np.where(payoff[:, 0] == 0, 0.0, np.nan)
+    breakevens = np.sort(np.concatenate([at_zero[:, None], crossing, beyond[:, None]], axis=1),
+                         axis=1)
+    # doublons quand deux strikes sont égaux
+    duplicated = np.zeros(breakevens.shape, dtype=bool)
+    duplicated[:, 1:] = breakevens[:, 1:] == breakevens[:, :-1]
+    breakevens[duplicated] = np.nan
+    breakevens = np.sort(breakevens, axis=1)
+    return {'max_profit': max_profit,
+            'max_loss': max_loss,
+            'breakevens': breakevens,
+            'points': points,
+            'payoff': payoff,
+            }
@@ -0,0 +1,250 @@
+"""Replay of the chain snapshots of a `store.SnapshotStore` through a
+selection rule, the positions being settled at expiry.
+
+>>> rule = explorator_rule(lambda calls, puts: Butterfly.explorator(calls, 50), top=3)
+>>> report = Backtest(SnapshotStore('snapshots'), rule, ticker=Ticker.CACPXA).run()
+>>> report['pnl'][-1]['cumulative'], report['fills']['fill_rate']
+"""
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+import instrument
+from batch import StrategyBatch
+from chain import OptionChain, CALL, PUT
+from scanner import KEYS, Scanner
+
+
+def third_friday(year, month):
+    first = date(year, month, 1)
+    return first + timedelta(days=(4 - first.weekday()) % 7 + 14)
+
+
+def expiry_date(expiry):
+    """Last trading day of an expiry of the store: 'YYYY-MM-DD' is the day
+    itself, 'YYYY-MM' the third friday of the month (monthly index options)
+    """
+    if expiry is None:
+        raise Exception('expiry "nearest" has no date, store the snapshots by expiry')
+    try:
+        return datetime.strptime(expiry, '%Y-%m-%d').date()
+    except ValueError:
+        pass
+    try:
+        month = datetime.strptime(expiry, '%Y-%m')
+    except ValueError:
+        raise Exception('expiry "{}" is not good'.format(expiry))
+    return third_friday(month.year, month.month)
+
+
+def implied_spot(chain):
+    """Underlying price from the put-call parity K + C - P, taken at the
+    strike where the call and put mids are the closest. No rate: the chain
+    is the last one before expiry.
+    """
+    mid = (np.asarray(chain.achat) + np.asarray(chain.vente)) / 2
+    calls = np.flatnonzero((chain.cat == CALL) & np.isfinite(mid))
+    puts = np.flatnonzero((chain.cat == PUT) & np.isfinite(mid))
+    strikes, i, j = np.intersect1d(chain.strike[calls], chain.strike[puts],
+                                   return_indices=True)
+    if not len(strikes):
+        raise Exception('no strike quoted in call and put to imply the spot')
+    parity = mid[calls[i]] - mid[puts[j]]
+    best = np.argmin(np.abs(parity))
+    return float(strikes[best] + parity[best])
+
+
+def _compile(selection, chain):
+    """StrategyBatch of what a rule returned: a StrategyBatch, a list of
+    `Strategy` or of `scanner.Candidate` found on chain
+    """
+    if isinstance(selection, StrategyBatch):
+        return selection
+    selection = list(selection)
+    if selection and hasattr(selection[0], 'cols'):
+        rows = np.repeat(np.arange(len(selection)), [len(c.cols) for c in selection])
+        return StrategyBatch(chain, rows,
+                             np.concatenate([c.cols for c in selection]),
+                             np.concatenate([c.quantities for c in selection]),
+                             labels=[c.label for c in selection])
+    return StrategyBatch.from_strategies(selection, chain=chain)
+
+
+def explorator_rule(explore, top=1, key='ratio', max_cost=None):
+    """Rule running explore(calls, puts), a list of `product.Option` each,
+    on every snapshot and keeping the top strategies on key (`scanner.KEYS`),
+    those with a leg not quoted being left out
+
+    >>> rule = explorator_rule(lambda calls, puts: CallSpread.explorator(calls, 100))
+    """
+    score = KEYS[key]
+
+    def rule(chain, snapshot):
+        strategies = list(explore(chain.calls.options(), chain.puts.options()))
+        if not strategies:
+            return []
+        batch = StrategyBatch.from_strategies(strategies, chain=chain)
+        scores = dict(batch.analytics(), cost=batch.cost)
+        value = np.where(np.isfinite(batch.cost), score(scores), -np.inf)
+        if max_cost is not None:
+            value = np.where(batch.cost <= max_cost, value, -np.inf)
+        order = np.argsort(-value, kind='stable')[:top]
+        return [strategies[i] for i in order if value[i] > -np.inf]
+    return rule
+
+
+def scanner_rule(top=1, **kwargs):
+    """Rule keeping the top candidates of `scanner.Scanner.top` on every snapshot
+
+    >>> rule = scanner_rule(3, families=['butterfly'], max_cost=50)
+    """
+    def rule(chain, snapshot):
+        return Scanner(chain).top(top, **kwargs)
+    return rule
+
+
+class Backtest:
+    """Stream the snapshots of store in time order, open the positions chosen
+    by rule at the quotes of the snapshot (ask to buy, bid to sell) and settle
+    them at the price of the underlying on the expiry.
+
+    Only the snapshot being read and the legs of the open positions are in
+    memory; every open position of an expiry is settled at once.
+
+    :param: rule rule(chain, (ticker, expiry, timestamp)) returning a list of
+            `Strategy`, of `scanner.Candidate` or a `StrategyBatch`,
+            see `explorator_rule` and `scanner_rule`
+    :param: settle price of the underlying at expiry, a dict on (ticker, expiry)
+            or on expiry, or settle(ticker, expiry, chain) called with the last
+            chain of the expiry. By default `implied_spot` of that chain.
+    :param: when when(ticker, expiry, timestamp) False skips the rule on
+            this snapshot, by default the rule runs on every snapshot
+    :param: quantity number of each strategy bought on a fill
+    """
+    def __init__(self, store, rule, settle=None, ticker=None, expiry=None,
+                 start=None, end=None, when=None, quantity=1):
+        self.store = store
+        self.rule = rule
+        self.settle = settle
+        self.ticker = ticker
+        self.expiry = expiry
+        self.start = start
+        self.end = end
+        self.when = when
+        self.quantity = quantity
+
+    def _settle_price(self, ticker, expiry, chain):
+        if self.settle is None:
+            return implied_spot(chain)
+        if callable(self.settle):
+            return self.settle(ticker, expiry, chain)
+        if (ticker, expiry) in self.settle:
+            return self.settle[(ticker, expiry)]
+        return self.settle[expiry]
+
+    @staticmethod
+    def _filled(batch):
+        """Strategies whose every leg is quoted: an ask to buy, a bid to sell"""
+        chain = batch.chain
+        quote = np.where(batch.quantities > 0, chain.achat[batch.cols], chain.vente[batch.cols])
+        missing = ~(quote > 0)
+        return np.bincount(batch.rows, weights=missing, minlength=len(batch)) == 0
+
+    @instrument.timed('backtest.open')
+    def _open(self, book, batch, snapshot, fills):
+        filled = self._filled(batch)
+        cost = batch.cost * self.quantity
+        fills['proposed'] += len(batch)
+        fills['filled'] += int(filled.sum())
+        fills['premium_paid'] += float(cost[filled & (cost > 0)].sum())
+        fills['premium_received'] += float(-cost[filled & (cost < 0)].sum())
+        rows = np.flatnonzero(filled)
+        legs = np.flatnonzero(filled[batch.rows])
+        # numéro de la position dans le livre de l'échéance
+        position = np.cumsum(filled) - 1 + len(book['cost'])
+        chain = batch.chain
+        cols = batch.cols[legs]
+        book['legs'].append((position[batch.rows[legs]],
+                             np.array(chain.strike[cols]),
+                             np.array(chain.cat[cols]),
+                             batch.quantities[legs] * self.quantity * chain.multiplier[cols]))
+        book['cost'].extend(cost[rows].tolist())
+        book['labels'].extend(batch.labels[i] for i in rows)
+        book['opened'].extend([snapshot[2]] * len(rows))
+
+    @instrument.timed('backtest.settle')
+    def _close(self, ticker, expiry, book):
+        """Settle every position of the book, return its P&L entry and positions"""
+        price = float(self._settle_price(ticker, expiry, book['chain']))
+        cost = np.array(book['cost'])
+        value = np.zeros(len(cost))
+        if book['legs']:
+            position, strike, cat, weight = (np.concatenate(column) for column in zip(*book['legs']))
+            legs = OptionChain(strike, 0.0, 0.0, cat)
+            intrinsic = legs.intrinsic([price])[:, 0]
+            value = np.bincount(position, weights=weight * intrinsic, minlength=len(cost))
+        pnl = value - cost
+        positions = [{'label': label, 'ticker': ticker, 'expiry': expiry,
+                      'opened': opened, 'cost': float(c), 'value': float(v), 'pnl': float(p)}
+                     for label, opened, c, v, p in zip(book['labels'], book['opened'],
+                                                       cost, value, pnl)]
+        entry = {'date': book['expires'], 'ticker': ticker, 'expiry': expiry,
+                 'settle': price, 'positions': len(cost), 'pnl': float(pnl.sum())}
+        return entry, positions
+
+    def run(self):
+        """Replay the snapshots, return a dict with:
+        - pnl: one entry per expiry settled, in order, with its date, settle
+          price, number of positions, pnl and cumulative pnl
+        - positions: every position settled with its cost, value and pnl
+        - fills: snapshots read, undated ones skipped (stored under 'nearest'),
+          strategies proposed by the rule and filled, fill_rate, premium paid
+          and received, positions still open
+        """
+        books = {}
+        series = []
+        positions = []
+        fills = {'snapshots': 0, 'undated': 0, 'proposed': 0, 'filled': 0,
+                 'premium_paid': 0.0, 'premium_received': 0.0}
+
+        def close(until):
+            for key in sorted((k for k, b in books.items() if b['expires'] < until),
+                              key=lambda k: (books[k]['expires'], k[0], k[1])):
+                book = books.pop(key)
+                if book['cost']:
+                    entry, settled = self._close(key[0], key[1], book)
+                    series.append(entry)
+                    positions.extend(settled)
+
+        last = None
+        for snapshot, chain in self.store.iter(self.ticker, self.expiry, self.start, self.end):
+            ticker, expiry, timestamp = snapshot
+            if expiry is None:
+                # 'nearest' : échéance inconnue, impossible de régler les positions
+                fills['undated'] += 1
+                continue
+            close(timestamp.date())
+            last = timestamp.date()
+            fills['snapshots'] += 1
+            book = books.get((ticker, expiry))
+            if book is None:
+                book = books[(ticker, expiry)] = {'expires': expiry_date(expiry), 'legs': [],
+                                                  'cost': [], 'labels': [], 'opened': []}
+            book['chain'] = chain
+            if timestamp.date() > book['expires']:
+                continue
+            if self.when is not None and not self.when(ticker, expiry, timestamp):
+                continue
+            with instrument.stage('backtest.select'):
+                batch = _compile(self.rule(chain, snapshot), chain)
+            if len(batch):
+                self._open(book, batch, snapshot, fills)
+        if last is not None:
+            close(last + timedelta(days=1))
+
+        cumulative = np.cumsum([entry['pnl'] for entry in series])
+        for entry, total in zip(series, cumulative):
+            entry['cumulative'] = float(total)
+        fills['fill_rate'] = fills['filled'] / fills['proposed'] if fills['proposed'] else 0.0
+        fills['open'] = sum(len(book['cost']) for book in books.values())
+        return {'pnl': series, 'positions': positions, 'fills': fills}
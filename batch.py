@@ -0,0 +1,157 @@
+import numpy as np
+
+import instrument
+from analytics import payoff_analytics
+from chain import OptionChain, CATEGORIES
+from strategy import Strategy
+
+
+class StrategyBatch:
+    """N strategies compiled over a shared `OptionChain`.
+
+    Each leg is a triplet (row, col, quantity): row is the strategy, col the
+    option in the chain and quantity is signed, > 0 for long, < 0 for short.
+    Payoffs of all the strategies come from one matrix product between the
+    (N, len(chain)) quantity matrix and the payoff matrix of the chain.
+
+    >>> batch = StrategyBatch.from_strategies(Butterfly.explorator(list(call.values())))
+    >>> batch.payoff(g.sT).shape
+    (len(batch), len(g.sT))
+    """
+    def __init__(self, chain, rows, cols, quantities, labels=None):
+        self.chain = chain
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.cols = np.asarray(cols, dtype=np.intp)
+        self.quantities = np.asarray(quantities, dtype=float)
+        if labels is not None:
+            self.size = len(labels)
+        else:
+            self.size = int(self.rows.max()) + 1 if len(self.rows) else 0
+        self.labels = labels if labels is not None else [''] * self.size
+        self._weights = None
+        self.cost = self._cost()
+
+    @classmethod
+    def from_strategies(cls, strategies, chain=None):
+        """Compile a list of `Strategy`.
+
+        Without chain, the chain is built from the options of the strategies
+        so the premiums are exactly the ones of their legs. With a chain, legs
+        are matched on category and strike and priced with the chain quotes.
+        """
+        strategies = list(strategies)
+        rows, options, quantities = [], [], []
+        for i, s in enumerate(strategies):
+            for option, sign, quantity in s.legs():
+                rows.append(i)
+                options.append(option)
+                quantities.append(sign * quantity)
+        if chain is None:
+            by_id = {}
+            for option in options:
+                by_id.setdefault(id(option), (len(by_id), option))
+            chain = OptionChain.from_options(o for _, o in by_id.values())
+            cols = [by_id[id(option)][0] for option in options]
+        else:
+            cols = chain.lookup([CATEGORIES.index(o.cat) for o in options],
+                                [o.strike for o in options])
+            if np.any(cols < 0):
+                missing = options[int(np.argmin(cols))]
+                raise KeyError((missing.cat, missing.strike))
+        return cls(chain, rows, cols, quantities, labels=[str(s) for s in strategies])
+
+    def __len__(self):
+        return self.size
+
+    def _cost(self):
+        chain = self.chain
+        premium = np.where(self.quantities > 0,
+                           chain.achat[self.cols], chain.vente[self.cols])
+        leg_cost = self.quantities * premium * chain.multiplier[self.cols]
+        return np.bincount(self.rows, weights=leg_cost, minlength=self.size)
+
+    def reprice(self, chain, changed):
+        """Take the quotes of chain, the same options in the same order as the
+        current chain, and recompute only the cost of the strategies having
+        a leg in the changed options. Return the index of these strategies.
+        """
+        self.chain = chain
+        rows = np.unique(self.rows[np.isin(self.cols, changed)])
+        legs = np.flatnonzero(np.isin(self.rows, rows))
+        cols = self.cols[legs]
+        quantities = self.quantities[legs]
+        premium = np.where(quantities > 0, chain.achat[cols], chain.vente[cols])
+        leg_cost = quantities * premium * chain.multiplier[cols]
+        cost = np.bincount(self.rows[legs], weights=leg_cost, minlength=self.size)
+        self.cost[rows] = cost[rows]
+        return rows
+
+    @property
+    def weights(self):
+        """Dense (N, len(chain)) signed quantity matrix"""
+        if self._weights is None:
+            self._weights = np.zeros((self.size, len(self.chain)))
+            np.add.at(self._weights, (self.rows, self.cols), self.quantities)
+        return self._weights
+
+    @instrument.timed('evaluate.batch')
+    def payoff(self, sT):
+        """Payoff matrix (N, len(sT)), row i equals `self.strategy(i).payoff(sT)`"""
+        instrument.count('strategies_evaluated', self.size)
+        value = self.chain.intrinsic(sT)
+        value *= self.chain.multiplier[:, None]
+        payoff = self.weights @ value
+        payoff -= self.cost[:, None]
+        return payoff
+
+    def padded_legs(self):
+        """Legs as (N, L) arrays of chain index and signed quantity, L being
+        the largest number of legs, shorter strategies padded with quantity 0
+        """
+        order = np.argsort(self.rows, kind='stable')
+        rows = self.rows[order]
+        counts = np.bincount(rows, minlength=self.size)
+        position = np.arange(len(rows)) - np.repeat(np.cumsum(counts) - counts, counts)
+        cols = np.zeros((self.size, counts.max() if len(rows) else 0), dtype=np.intp)
+        quantities = np.zeros(cols.shape)
+        cols[rows, position] = self.cols[order]
+        quantities[rows, position] = self.quantities[order]
+        return cols, quantities
+
+    def analytics(self):
+        """Exact max_profit, max_loss and breakevens of every strategy,
+        see `analytics.payoff_analytics`
+        """
+        cols, quantities = self.padded_legs()
+        chain = self.chain
+        return payoff_analytics(chain.strike[cols], chain.sign[cols],
+                                quantities * chain.multiplier[cols], self.cost)
+
+    def legs(self, i):
+        """Legs (col, quantity) of the i-th strategy"""
+        mask = self.rows == i
+        return zip(self.cols[mask], self.quantities[mask])
+
+    def strategy(self, i):
+        """Return the i-th strategy as a `Strategy`"""
+        strategy = Strategy(self.labels[i])
+        for col, quantity in self.legs(i):
+            direction = 'long' if quantity > 0 else 'short'
+            strategy.add(self.chain.option(col), direction, abs(quantity))
+        return strategy
+
+    def summary(self, i):
+        """Same as `Strategy.summary` for the i-th strategy"""
+        chain = self.chain
+        summary = []
+        for col, quantity in self.legs(i):
+            direction = 'long' if quantity > 0 else 'short'
+            premium = chain.premium(direction)[col]
+            summary.append({'cat': CATEGORIES[chain.cat[col]],
+                            'strike': chain.strike[col],
+                            'direction': direction,
+                            'quantity': abs(quantity),
+                            'cost': chain.multiplier[col] * premium * abs(quantity),
+                            'premium': premium,
+                            })
+        return summary
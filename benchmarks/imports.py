@@ -0,0 +1,57 @@
+"""Import time of the modules, each in a fresh interpreter, and the heavy
+dependencies they load
+
+    python -m benchmarks.imports            # every module
+    python -m benchmarks.imports graph      # only graph
+
+The exit code is 1 when a module of LIGHT loads one of HEAVY at import.
+"""
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY = ('matplotlib', 'tabulate', 'IPython', 'requests', 'bs4', 'scipy', 'aiohttp', 'pandas', 'numba')
+LIGHT = ('product', 'chain', 'strategy', 'analytics', 'batch', 'scanner', 'pricing',
+         'volatility', 'montecarlo', 'incremental', 'store', 'fastparse', 'cache',
+         'euronext', 'screen', 'graph', 'backtest', 'portfolio', 'feed',
+         'kernels')
+# modules dont les dépendances lourdes sont la raison d'être
+OTHERS = ('render', 'fetcher')
+
+SCRIPT = '''
+import json, sys, time
+start = time.perf_counter()
+{imports}
+print(json.dumps({{'seconds': time.perf_counter() - start,
+                  'heavy': [name for name in {heavy!r} if name in sys.modules]}}))
+'''
+
+
+def load(*modules):
+    """Import modules in a new interpreter, return the import time in seconds
+    and the heavy modules loaded
+    """
+    script = SCRIPT.format(imports='\n'.join('import ' + m for m in modules), heavy=HEAVY)
+    output = subprocess.run([sys.executable, '-c', script], cwd=ROOT, check=True,
+                            capture_output=True, text=True).stdout
+    return json.loads(output)
+
+
+def main(argv=None):
+    modules = (sys.argv[1:] if argv is None else argv) or LIGHT + OTHERS
+    leaks = []
+    for module in modules:
+        result = load(module)
+        line = '{:<12} {:8.1f} ms  {}'.format(module, result['seconds'] * 1e3,
+                                             ' '.join(result['heavy']))
+        if module in LIGHT and result['heavy']:
+            line += '  HEAVY IMPORT'
+            leaks.append(module)
+        print(line)
+    return 1 if leaks else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
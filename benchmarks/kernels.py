@@ -0,0 +1,68 @@
+"""Compare the payoff of a strategy with one temporary array per leg and
+operation (as `Option._payoff` did) with the fused kernels of each
+backend, on grids of 1e4 to 1e7 prices
+
+    python -m benchmarks.kernels
+"""
+import timeit
+
+import numpy as np
+
+import kernels
+from benchmarks import synthetic
+from strategy import Strategy
+
+
+def strategy(legs=50):
+    """Strategy of legs calls and puts, long and short, quantities 1 and 2"""
+    calls, puts = synthetic.options(legs)
+    strategy = Strategy('{} legs'.format(legs))
+    for i, (call, put) in enumerate(zip(calls.values(), puts.values())):
+        strategy.add(call if i % 2 else put, 'long' if i % 3 else 'short', 1 + i % 2)
+    return strategy
+
+
+def temporaries(strategy, sT):
+    """Payoff summed leg by leg with the temporaries of np.where"""
+    payoff_sum = 0
+    for option, sign, quantity in strategy.legs():
+        premium, multiplier = ((option.achat, option.multiplier) if sign > 0
+                               else (option.vente, -option.multiplier))
+        if option.cat == 'Call':
+            payoff = (np.where(sT > option.strike, sT - option.strike, 0) - premium) * multiplier
+        else:
+            payoff = (np.where(sT < option.strike, option.strike - sT, 0) - premium) * multiplier
+        payoff_sum += payoff * quantity
+    return payoff_sum
+
+
+def backends():
+    """Backends usable here"""
+    available = ['numpy']
+    try:
+        kernels.set_backend('numba')
+        available.append('numba')
+    except ImportError:
+        pass
+    return available
+
+
+def main(legs=50, repeat=3):
+    s = strategy(legs)
+    names = backends()
+    for size in (10 ** 4, 10 ** 5, 10 ** 6, 10 ** 7):
+        sT = np.linspace(0, 10000, size)
+        number = max(1, 10 ** 6 // size)
+        line = '{:>9} prices  temporaries {:9.3f} ms'.format(size, min(timeit.repeat(
+            lambda: temporaries(s, sT), number=number, repeat=repeat)) / number * 1e3)
+        for name in names:
+            kernels.set_backend(name)
+            s.payoff(sT[:10])  # compilation de numba hors mesure
+            elapsed = min(timeit.repeat(lambda: s.payoff(sT), number=number, repeat=repeat)) / number
+            line += '  {} {:9.3f} ms'.format(name, elapsed * 1e3)
+        print(line)
+    kernels.set_backend()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+"""Compare the BeautifulSoup and the fast parser of `euronext.Page`
+
+    python -m benchmarks.parse [saved_page.html ...]
+
+Without file, synthetic pages of 50, 200 and 1000 strikes are used.
+"""
+import sys
+import timeit
+
+from euronext import Page
+from benchmarks.synthetic import page_html
+
+
+def bench(name, content, number=10):
+    page = Page()
+    results = {}
+    for parser in ('bs4', 'fast'):
+        def run():
+            page.load(content, parser=parser)
+            return page.scrap_chain()
+        results[parser] = min(timeit.repeat(run, number=number, repeat=3)) / number
+    chain = page.scrap_chain()
+    print('{:<30} {:>6} options  bs4 {:8.2f} ms  fast {:8.2f} ms  x{:.1f}'.format(
+        name, len(chain), results['bs4'] * 1e3, results['fast'] * 1e3,
+        results['bs4'] / results['fast']))
+    return results
+
+
+def main(paths):
+    if paths:
+        for path in paths:
+            with open(path, 'rb') as f:
+                bench(path, f.read())
+    else:
+        for n in (50, 200, 1000):
+            bench('synthetic {} strikes'.format(n), page_html(n))
+
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
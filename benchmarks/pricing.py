@@ -0,0 +1,42 @@
+"""Compare the vectorized Black-Scholes of `pricing` with a loop of scalar
+`math` prices on chains of 50, 200 and 1000 strikes
+
+    python -m benchmarks.pricing
+"""
+import math
+import timeit
+
+from pricing import black_scholes
+from benchmarks.synthetic import chain as synthetic_chain
+
+
+def naive(w, S, K, T, r, sigma):
+    """Price, delta, gamma, vega and theta of one option with math"""
+    N = lambda x: 0.5 * math.erfc(-x / math.sqrt(2))
+    n = lambda x: math.exp(-0.5 * x * x) / math.sqrt(2 * math.pi)
+    d1 = (math.log(S / K) + (r + 0.5 * sigma * sigma) * T) / (sigma * math.sqrt(T))
+    d2 = d1 - sigma * math.sqrt(T)
+    strike = K * math.exp(-r * T)
+    return (w * (S * N(w * d1) - strike * N(w * d2)),
+            w * N(w * d1),
+            n(d1) / (S * sigma * math.sqrt(T)),
+            S * n(d1) * math.sqrt(T),
+            -S * n(d1) * sigma / (2 * math.sqrt(T)) - w * r * strike * N(w * d2))
+
+
+def main(number=20):
+    S, T, r, sigma = 5000, 0.25, 0.01, 0.2
+    for n in (50, 200, 1000):
+        chain = synthetic_chain(n)
+        w = chain.sign
+        vector = min(timeit.repeat(lambda: black_scholes(w, S, chain.strike, T, r, sigma),
+                                   number=number, repeat=3)) / number
+        loop = min(timeit.repeat(lambda: [naive(wi, S, k, T, r, sigma)
+                                          for wi, k in zip(w, chain.strike)],
+                                 number=number, repeat=3)) / number
+        print('{:>5} options  loop {:8.3f} ms  vectorized {:8.3f} ms  x{:.1f}'.format(
+            len(chain), loop * 1e3, vector * 1e3, loop / vector))
+
+
+if __name__ == '__main__':
+    main()
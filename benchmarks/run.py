@@ -0,0 +1,185 @@
+"""Benchmarks of the hot paths with stored baselines
+
+    python -m benchmarks.run                  # run and compare with the baseline
+    python -m benchmarks.run --save           # run and store the baseline
+    python -m benchmarks.run -k explorator    # only the benchmarks matching
+    python -m benchmarks.run --pages DIR      # scrap_options on saved .html pages
+
+A benchmark is a regression when it is slower than its baseline by more
+than --tolerance (default 25%); the exit code is then 1.
+"""
+import argparse
+import glob
+import importlib.util
+import json
+import os
+import sys
+import timeit
+from functools import partial
+
+import numpy as np
+
+from benchmarks import imports, synthetic
+from strategy import BoxSpread, Butterfly, CallSpread, PutSpread, RatioSpread, Strategy
+
+BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+SIZES = (50, 200, 1000)
+BENCHMARKS = {}
+
+
+def benchmark(name):
+    """Register a function returning the callable to time"""
+    def register(setup):
+        BENCHMARKS[name] = setup
+        return setup
+    return register
+
+
+@benchmark('option_payoff[sT=1e6]')
+def option_payoff():
+    calls, _ = synthetic.options(50)
+    option = calls[5000]
+    sT = np.linspace(0, 10000, 1000000)
+    return lambda: option.payoff(sT, 'long')
+
+
+@benchmark('strategy_payoff[legs=50,sT=1e5]')
+def strategy_payoff():
+    calls, puts = synthetic.options(50)
+    strategy = Strategy('many legs')
+    for i, (call, put) in enumerate(zip(calls.values(), puts.values())):
+        strategy.add(call if i % 2 else put, 'long' if i % 3 else 'short', 1 + i % 2)
+    sT = np.linspace(0, 10000, 100000)
+    return lambda: strategy.payoff(sT)
+
+
+def _kernel(backend):
+    from benchmarks import kernels as benchmark_kernels
+    import kernels
+    strategy = benchmark_kernels.strategy(50)
+    sT = np.linspace(0, 10000, 1000000)
+
+    def run():
+        previous = kernels.get_backend()
+        kernels.set_backend(backend)
+        try:
+            return strategy.payoff(sT)
+        finally:
+            kernels.set_backend(previous)
+    run()
+    return run
+
+
+benchmark('kernel[numpy,legs=50,sT=1e6]')(partial(_kernel, 'numpy'))
+if importlib.util.find_spec('numba'):
+    benchmark('kernel[numba,legs=50,sT=1e6]')(partial(_kernel, 'numba'))
+
+
+EXPLORATORS = {
+    'CallSpread': lambda calls, puts, step: CallSpread.explorator(calls, step),
+    'PutSpread': lambda calls, puts, step: PutSpread.explorator(puts, step),
+    'Butterfly': lambda calls, puts, step: Butterfly.explorator(calls, step),
+    'RatioSpread': lambda calls, puts, step: RatioSpread.explorator(calls, step),
+    'BoxSpread': lambda calls, puts, step: BoxSpread.explorator(calls, puts, spread=step,
+                                                                gap=2 * step, step=step),
+}
+
+
+def _explorator(n, explore):
+    """explorator on a synthetic chain of n strikes, step of 2 strikes"""
+    calls, puts = synthetic.options(n)
+    step = 2 * (5000 / n)
+    return lambda: explore(list(calls.values()), list(puts.values()), step)
+
+
+def _scrap(content, parser='bs4'):
+    from euronext import Page
+    page = Page()
+
+    def run():
+        page.load(content, parser=parser)
+        return page.scrap_options()
+    return run
+
+
+for _n in SIZES:
+    for _name, _explore in EXPLORATORS.items():
+        benchmark('{}.explorator[{}]'.format(_name, _n))(partial(_explorator, _n, _explore))
+    benchmark('Page.scrap_options[{}]'.format(_n))(partial(lambda n: _scrap(synthetic.page_html(n)), _n))
+
+
+@benchmark('Graph.profit_rainbow[assets=50]')
+def profit_rainbow():
+    import matplotlib
+    matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    from graph import Graph
+    calls, _ = synthetic.options(50)
+    graph = Graph(2500, 7500, 1)
+
+    def run():
+        graph.profit_rainbow(list(calls.values()), 'long')
+        plt.close('all')
+    return run
+
+
+CORE = ('product', 'chain', 'strategy', 'batch', 'scanner', 'pricing')
+
+
+for _name, _modules in (('core', CORE), ('euronext', ('euronext',)), ('graph', ('graph',))):
+    # le temps mesuré comprend le démarrage de l'interpréteur
+    benchmark('import[{}]'.format(_name))(partial(lambda modules: partial(imports.load, *modules), _modules))
+
+
+def measure(run, repeat=3):
+    """Best time of one call of run, in seconds"""
+    timer = timeit.Timer(run)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmarks of the hot paths')
+    parser.add_argument('-k', dest='pattern', default='', help='run the benchmarks containing this text')
+    parser.add_argument('--save', action='store_true', help='store the results as the baseline')
+    parser.add_argument('--baseline', default=BASELINE, help='baseline file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='slowdown flagged as regression')
+    parser.add_argument('--pages', help='directory of saved Euronext .html pages')
+    args = parser.parse_args(argv)
+
+    if args.pages:
+        for path in sorted(glob.glob(os.path.join(args.pages, '*.html'))):
+            with open(path, 'rb') as f:
+                content = f.read()
+            benchmark('Page.scrap_options[{}]'.format(os.path.basename(path)))(
+                lambda content=content: _scrap(content))
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+
+    results = {}
+    regressions = []
+    for name, setup in BENCHMARKS.items():
+        if args.pattern not in name:
+            continue
+        results[name] = measure(setup())
+        line = '{:<40} {:10.3f} ms'.format(name, results[name] * 1e3)
+        if name in baseline:
+            ratio = results[name] / baseline[name]
+            line += '  x{:.2f} of baseline'.format(ratio)
+            if ratio > 1 + args.tolerance:
+                line += '  REGRESSION'
+                regressions.append(name)
+        print(line)
+
+    if args.save:
+        baseline.update(results)
+        with open(args.baseline, 'w') as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
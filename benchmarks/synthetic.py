@@ -0,0 +1,68 @@
+"""Reproducible synthetic inputs for the benchmarks"""
+import numpy as np
+
+from chain import OptionChain
+from product import Option
+
+HEADERS = ['Settl.C', 'OIC', 'Day Vol C', 'Last C', 'bid C', 'ask C', 'C',
+           'strike', 'P', 'bid P', 'ask P', 'Last P', 'Day Vol P', 'OIP', 'Settl.P']
+
+
+def quotes(n_strikes, spot=5000, step=None, seed=0):
+    """Strikes and bid/ask of calls and puts around spot, some quotes missing.
+    By default the strikes span spot +/- 50%
+    """
+    rng = np.random.default_rng(seed)
+    step = step or spot / n_strikes
+    strikes = spot + step * (np.arange(n_strikes) - n_strikes // 2)
+    time_value = 80 * np.exp(-((strikes - spot) / (0.1 * spot)) ** 2) + 0.5
+    call = np.maximum(spot - strikes, 0) + time_value
+    put = np.maximum(strikes - spot, 0) + time_value
+    spread = rng.uniform(0.5, 3, n_strikes).round(2)
+    missing = rng.random(n_strikes) < 0.1
+    return strikes, call.round(2), spread, put.round(2), missing
+
+
+def options(n_strikes, multiplier=10, seed=0):
+    """Dicts strike -> `Option` of the calls and of the puts, as returned by
+    `Page.scrap_options`
+    """
+    strikes, call, spread, put, _ = quotes(n_strikes, seed=seed)
+    calls = {k: Option('Call', strike=k, achat=c + s, vente=c, multiplier=multiplier)
+             for k, c, s in zip(strikes, call, spread)}
+    puts = {k: Option('Put', strike=k, achat=p + s, vente=p, multiplier=multiplier)
+            for k, p, s in zip(strikes, put, spread)}
+    return calls, puts
+
+
+def chain(n_strikes, multiplier=10, seed=0):
+    """`OptionChain` of the calls then the puts of n_strikes strikes"""
+    strikes, call, spread, put, _ = quotes(n_strikes, seed=seed)
+    return OptionChain(np.concatenate([strikes, strikes]),
+                       np.concatenate([call + spread, put + spread]),
+                       np.concatenate([call, put]),
+                       np.repeat([0, 1], n_strikes),
+                       multiplier)
+
+
+def page_html(n_strikes=200, spot=5000, step=None, seed=0, filler=2000):
+    """Page shaped like an Euronext option page: title, navigation filler
+    and the call-put-table with 3 header rows and a footer row
+    """
+    strikes, call, spread, put, missing = quotes(n_strikes, spot, step, seed)
+    rows = []
+    for k, c, s, p, m in zip(strikes, call, spread, put, missing):
+        call_bid = '-' if m else '{:.2f}'.format(c)
+        cells = ['{:.2f}'.format(c), '100', '10', '{:.2f}'.format(c), call_bid,
+                 '{:.2f}'.format(c + s), 'C', '{:.2f}'.format(k), 'P',
+                 '{:.2f}'.format(p), '{:.2f}'.format(p + s), '{:.2f}'.format(p),
+                 '10', '100', '{:.2f}'.format(p)]
+        rows.append('<tr>' + ''.join('<td class="cell">{}</td>'.format(c) for c in cells) + '</tr>')
+    headers = '<tr>' + ''.join('<th>{}</th>'.format(h) for h in HEADERS) + '</tr>'
+    nav = ''.join('<li><a href="/link/{0}">Link {0}</a></li>'.format(i) for i in range(filler))
+    return ('<html><head><title>Options</title></head><body>'
+            '<ul class="nav">' + nav + '</ul>'
+            '<h1 class="title">CAC 40 Index options</h1>'
+            '<div class="call-put-table"><table>' + headers * 3 + ''.join(rows) +
+            '<tr><td>Footer</td></tr></table></div>'
+            '<div class="footer">' + nav + '</div></body></html>').encode()
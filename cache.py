@@ -0,0 +1,117 @@
+import hashlib
+import json
+import os
+import time
+from collections import OrderedDict
+
+
+class ResponseCache:
+    """Cache of HTTP responses keyed on the url, used by `Page.fetch`.
+
+    - a response younger than ttl seconds is returned without request
+    - an older one is revalidated with If-None-Match/If-Modified-Since when
+      the server sent an ETag/Last-Modified, a 304 answer keeps it
+    - at most maxsize responses are kept, the least recently used is evicted
+    - with directory, the responses are stored on disk and survive the process
+
+    >>> cache = ResponseCache(ttl=300, directory='.cache')
+    >>> page.fetch(cache=cache)
+    >>> cache.stats()
+    {'hits': 3, 'revalidated': 1, 'misses': 1, 'size': 1}
+    """
+    def __init__(self, ttl=60, maxsize=128, directory=None):
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.directory = directory
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+        self.entries = OrderedDict()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._load()
+
+    def _key(self, url):
+        return hashlib.sha1(url.encode()).hexdigest()
+
+    def _file(self, url, extension):
+        return os.path.join(self.directory, self._key(url) + extension)
+
+    def _load(self):
+        metas = []
+        for name in os.listdir(self.directory):
+            if name.endswith('.json'):
+                with open(os.path.join(self.directory, name)) as f:
+                    metas.append(json.load(f))
+        for meta in sorted(metas, key=lambda meta: meta['used']):
+            self.entries[meta['url']] = meta
+
+    def _body(self, url):
+        meta = self.entries[url]
+        if not self.directory:
+            return meta['content']
+        with open(self._file(url, '.body'), 'rb') as f:
+            return f.read()
+
+    def _store(self, url, meta, content=None):
+        meta['used'] = time.time()
+        self.entries[url] = meta
+        self.entries.move_to_end(url)
+        if self.directory:
+            if content is not None:
+                with open(self._file(url, '.body'), 'wb') as f:
+                    f.write(content)
+            with open(self._file(url, '.json'), 'w') as f:
+                json.dump(meta, f)
+        elif content is not None:
+            meta['content'] = content
+        while len(self.entries) > self.maxsize:
+            self._evict(next(iter(self.entries)))
+
+    def _evict(self, url):
+        del self.entries[url]
+        if self.directory:
+            for extension in ('.body', '.json'):
+                if os.path.exists(self._file(url, extension)):
+                    os.remove(self._file(url, extension))
+
+    def get(self, url, timeout=None):
+        """Content of url, from the cache when possible"""
+        meta = self.entries.get(url)
+        now = time.time()
+        if meta is not None and now - meta['stored'] < self.ttl:
+            self.hits += 1
+            self._store(url, meta)
+            return self._body(url)
+        headers = {}
+        if meta is not None:
+            if meta.get('etag'):
+                headers['If-None-Match'] = meta['etag']
+            if meta.get('last_modified'):
+                headers['If-Modified-Since'] = meta['last_modified']
+        import requests
+        response = requests.get(url, headers=headers, timeout=timeout)
+        if meta is not None and headers and response.status_code == 304:
+            self.revalidated += 1
+            meta['stored'] = now
+            self._store(url, meta)
+            return self._body(url)
+        response.raise_for_status()
+        self.misses += 1
+        self._store(url, {'url': url,
+                          'stored': now,
+                          'etag': response.headers.get('ETag'),
+                          'last_modified': response.headers.get('Last-Modified'),
+                          }, response.content)
+        return response.content
+
+    def clear(self):
+        for url in list(self.entries):
+            self._evict(url)
+
+    def stats(self):
+        return {'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'size': len(self.entries),
+                }
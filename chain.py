@@ -0,0 +1,244 @@
+import numpy as np
+
+from product import Option
+
+CALL = 0
+PUT = 1
+CATEGORIES = ('Call', 'Put')
+TOLERANCE = 1e-6
+
+
+def _scalar(value, like):
+    return int(value) if np.ndim(like) == 0 else value
+
+
+class StrikeIndex:
+    """Strikes sorted once, queried by binary search (`np.searchsorted`)
+    with many targets at once. Strikes match within tol, so 4333.33 + 50
+    finds 4383.33 even if the floats differ in the last digits.
+
+    Queries return the position of the strike in the sequence indexed (or
+    in positions when given), -1 when not found.
+
+    >>> index = StrikeIndex([o.strike for o in list_call])
+    >>> list_call[index.nearest(4980)]
+    >>> index.find([4900, 5000, 5100])
+    array([12, 16, -1])
+    """
+    def __init__(self, strikes, positions=None, tol=TOLERANCE):
+        strikes = np.asarray(strikes, dtype=float)
+        order = np.argsort(strikes, kind='stable')
+        self.strikes = strikes[order]
+        self.positions = order if positions is None else np.asarray(positions)[order]
+        self.tol = tol
+
+    def __len__(self):
+        return len(self.strikes)
+
+    def __contains__(self, strike):
+        return self.find(strike) >= 0
+
+    def find(self, targets):
+        """Position of the strike equal to each target within tol, -1 if none"""
+        targets = np.asarray(targets, dtype=float)
+        if not len(self):
+            return _scalar(np.full(targets.shape, -1), targets)
+        i = np.minimum(np.searchsorted(self.strikes, targets - self.tol), len(self) - 1)
+        found = np.abs(self.strikes[i] - targets) <= self.tol
+        return _scalar(np.where(found, self.positions[i], -1), targets)
+
+    def nearest(self, prices):
+        """Position of the strike closest to each price, the lower one on a tie"""
+        if not len(self):
+            raise Exception('no strike to be near of')
+        prices = np.asarray(prices, dtype=float)
+        i = np.searchsorted(self.strikes, prices)
+        high = np.minimum(i, len(self) - 1)
+        low = np.maximum(i - 1, 0)
+        lower = np.abs(prices - self.strikes[low]) <= np.abs(self.strikes[high] - prices)
+        return _scalar(self.positions[np.where(lower, low, high)], prices)
+
+    atm = nearest
+
+    def between(self, low, high):
+        """Positions of the strikes in [low, high], in increasing strike"""
+        start = np.searchsorted(self.strikes, low - self.tol, side='left')
+        stop = np.searchsorted(self.strikes, high + self.tol, side='right')
+        return self.positions[start:stop]
+
+
+class OptionChain:
+    """Columnar chain of options: one NumPy array per field instead of
+    one `product.Option` per strike.
+
+    - strike: strike of each option
+    - achat: premium paid to buy the option (ask)
+    - vente: premium received selling the option (bid)
+    - cat: CALL (0) or PUT (1)
+    - multiplier: contract multiplier
+    - volume: day volume, NaN when unknown
+    - open_interest: open interest, NaN when unknown
+
+    >>> chain = OptionChain.from_options(list(call.values()) + list(put.values()))
+    >>> chain.payoff(g.sT, 'long').shape
+    (len(chain), len(g.sT))
+    """
+    def __init__(self, strike, achat, vente, cat, multiplier=1,
+                 volume=None, open_interest=None):
+        self.strike = np.asarray(strike, dtype=float)
+        self.achat = np.asarray(achat, dtype=float)
+        self.vente = np.asarray(vente, dtype=float)
+        self.cat = np.asarray(cat, dtype=np.int8)
+        self.multiplier = self._column(multiplier)
+        self.volume = self._column(np.nan if volume is None else volume)
+        self.open_interest = self._column(np.nan if open_interest is None else open_interest)
+        self._strikes = {}
+
+    def _column(self, value):
+        """Float column of the size of the chain, a scalar is repeated"""
+        value = np.asarray(value, dtype=float)
+        if value.shape == self.strike.shape:
+            return value
+        return np.full(self.strike.shape, value)
+
+    @classmethod
+    def from_options(cls, options):
+        """Build a chain from an iterable of `product.Option`"""
+        options = list(options)
+        return cls(strike=[o.strike for o in options],
+                   achat=[o.achat for o in options],
+                   vente=[o.vente for o in options],
+                   cat=[CATEGORIES.index(o.cat) for o in options],
+                   multiplier=[o.multiplier for o in options])
+
+    def __len__(self):
+        return len(self.strike)
+
+    def __repr__(self):
+        return 'OptionChain({} calls, {} puts)'.format(int(np.sum(self.cat == CALL)),
+                                                       int(np.sum(self.cat == PUT)))
+
+    @property
+    def sign(self):
+        """+1 for a call, -1 for a put"""
+        return np.where(self.cat == CALL, 1.0, -1.0)
+
+    def strikes(self, cat):
+        """`StrikeIndex` of the options of category cat ('Call', 'Put', CALL
+        or PUT), giving positions in the chain, built once
+        """
+        cat = CATEGORIES.index(cat) if isinstance(cat, str) else int(cat)
+        if cat not in self._strikes:
+            positions = np.flatnonzero(self.cat == cat)
+            self._strikes[cat] = StrikeIndex(self.strike[positions], positions)
+        return self._strikes[cat]
+
+    def lookup(self, cat, strike):
+        """Positions in the chain of many options at once, cat and strike
+        being arrays (cat as CALL or PUT), -1 for the options not in the chain
+        """
+        cat, strike = np.broadcast_arrays(np.asarray(cat), np.asarray(strike, dtype=float))
+        positions = np.full(cat.shape, -1, dtype=np.intp)
+        for code in (CALL, PUT):
+            mask = cat == code
+            if mask.any():
+                positions[mask] = self.strikes(code).find(strike[mask])
+        return positions
+
+    def index(self, cat, strike):
+        """Position in the chain of the option of category cat ('Call', 'Put')
+        and strike
+        """
+        i = self.strikes(cat).find(strike)
+        if np.any(np.asarray(i) < 0):
+            raise KeyError((cat, strike))
+        return i
+
+    def same_layout(self, other):
+        """True when other lists the same options in the same order, so an
+        index in one is the same option in the other
+        """
+        return (len(self) == len(other) and np.array_equal(self.strike, other.strike)
+                and np.array_equal(self.cat, other.cat))
+
+    def diff(self, previous):
+        """Changes of quotes since the previous snapshot of the same chain
+
+        Return a dict of index arrays:
+        - changed: options of self whose achat or vente changed
+        - added: options of self not in previous
+        - removed: options of previous not in self
+        """
+        def same(a, b):
+            return (a == b) | (np.isnan(a) & np.isnan(b))
+
+        if self.same_layout(previous):
+            changed = ~(same(self.achat, previous.achat) & same(self.vente, previous.vente))
+            empty = np.array([], dtype=np.intp)
+            return {'changed': np.flatnonzero(changed), 'added': empty, 'removed': empty}
+        keys = self.cat * 1e12 + self.strike
+        previous_keys = previous.cat * 1e12 + previous.strike
+        common, mine, theirs = np.intersect1d(keys, previous_keys, return_indices=True)
+        changed = ~(same(self.achat[mine], previous.achat[theirs]) &
+                    same(self.vente[mine], previous.vente[theirs]))
+        return {'changed': np.sort(mine[changed]),
+                'added': np.flatnonzero(~np.isin(keys, previous_keys)),
+                'removed': np.flatnonzero(~np.isin(previous_keys, keys)),
+                }
+
+    def option(self, i):
+        """Return the i-th element of the chain as a `product.Option`"""
+        return Option(CATEGORIES[self.cat[i]],
+                      strike=float(self.strike[i]),
+                      achat=float(self.achat[i]),
+                      vente=float(self.vente[i]),
+                      multiplier=float(self.multiplier[i]))
+
+    def options(self):
+        return [self.option(i) for i in range(len(self))]
+
+    def select(self, mask):
+        """Return a new chain with the elements selected by mask (bool or index array)"""
+        return OptionChain(self.strike[mask], self.achat[mask], self.vente[mask],
+                           self.cat[mask], self.multiplier[mask],
+                           self.volume[mask], self.open_interest[mask])
+
+    @property
+    def calls(self):
+        return self.select(self.cat == CALL)
+
+    @property
+    def puts(self):
+        return self.select(self.cat == PUT)
+
+    def intrinsic(self, sT):
+        """Value at expiry of every option for every price of sT,
+        shape (len(chain), len(sT))
+        """
+        sT = np.asarray(sT, dtype=float)
+        return np.maximum(self.sign[:, None] * (sT[None, :] - self.strike[:, None]), 0)
+
+    def premium(self, direction):
+        if direction == 'long':
+            return self.achat
+        elif direction == 'short':
+            return -self.vente
+        raise Exception('direction "{}" is not good'.format(direction))
+
+    def cost(self, direction):
+        return self.multiplier * self.premium(direction)
+
+    def payoff(self, sT, direction):
+        """Payoff matrix (len(chain), len(sT)), row i equals
+        `self.option(i).payoff(sT, direction)`
+        """
+        if direction == 'long':
+            premium, multiplier = self.achat, self.multiplier
+        elif direction == 'short':
+            premium, multiplier = self.vente, -self.multiplier
+        else:
+            raise Exception('direction "{}" is not good'.format(direction))
+        payoff = self.intrinsic(sT)
+        payoff -= premium[:, None]
+        payoff *= multiplier[:, None]
+        return payoff
@@ -1,9 +1,11 @@
 from enum import Enum
 from urllib.parse import urlencode
 
-import requests
-from bs4 import BeautifulSoup
+import numpy as np
 
+import fastparse
+import instrument
+from chain import OptionChain, CALL, PUT
 from product import Option
 
 class Ticker(Enum):
@@ -39,37 +41,111 @@ class Page:
     def _url(self):
         return "{}/{}?{}".format(self.site, self.ticker, self.params)
         
-    def fetch(self, return_content=False):
-        requete = requests.get(self._url)
-        page = requete.content
-        self.soup = BeautifulSoup(page, features="html.parser")
-        self.page_title = self.soup.find("h1", {"class": "title"}).text
+    @instrument.timed('fetch')
+    def fetch(self, return_content=False, parser='bs4', cache=None, timeout=None):
+        """Download and parse the page
+
+        :param: cache `cache.ResponseCache` to reuse a recent download of the same url
+        :param: timeout seconds to wait for the server, None to wait forever
+        """
+        instrument.count('pages_fetched')
+        if cache is not None:
+            with instrument.stage('fetch.http'):
+                content = cache.get(self._url, timeout=timeout)
+            return self.load(content, return_content, parser)
+        import requests
+        with instrument.stage('fetch.http'):
+            requete = requests.get(self._url, timeout=timeout)
+        return self.load(requete.content, return_content, parser)
+
+    @instrument.timed('parse')
+    def load(self, page, return_content=False, parser='bs4'):
+        """Parse the content of the page already downloaded
+
+        :param: parser 'bs4' builds the whole BeautifulSoup tree,
+                'fast' only streams the rows of the call-put-table
+        """
         self.call = {}
         self.put = {}
+        if parser == 'fast':
+            self.soup = None
+            self.page_title, self.rows = fastparse.parse(page)
+            return
+        if parser != 'bs4':
+            raise Exception('parser "{}" is not good'.format(parser))
+        from bs4 import BeautifulSoup
+        self.rows = None
+        self.soup = BeautifulSoup(page, features="html.parser")
+        self.page_title = self.soup.find("h1", {"class": "title"}).text
         if return_content:
             return self.soup
 
+    def _scrap_rows(self):
+        """Text of the cells of every option row of the call-put-table"""
+        if self.rows is not None:
+            self.data = self.rows
+        else:
+            div = self.soup.find("div", {"class": "call-put-table"})
+            trs = div.find_all("tr")
+            self.data = [[td.text for td in tr.find_all('td')] for tr in trs[3:-1]]
+        instrument.count('rows_parsed', len(self.data))
+        return self.data
+
+    @instrument.timed('scrap.options')
     def scrap_options(self, multiplier=1):
-        div = self.soup.find("div", {"class": "call-put-table"})
-        trs = div.find_all("tr")
-        elmts = {}
         self.call = {}
         self.put = {}
-        self.data = []
-        for tr in trs[3:-1]:
-            tds = tr.find_all('td')
-            self.data.append([td.text for td in tds])
-            strike = float(tds[7].text)
-            if (str(tds[4].text) != '-' and
-                str(tds[5].text) != '-'):
-                vente = float(tds[4].text)
-                achat = float(tds[5].text)
+        for cells in self._scrap_rows():
+            strike = float(cells[7])
+            if cells[4] != '-' and cells[5] != '-':
+                vente = float(cells[4])
+                achat = float(cells[5])
                 c = Option('Call', strike=strike, achat=achat, vente=vente, multiplier=multiplier)
                 self.call[float(c.strike)] = c
-            if (str(tds[9].text) != '-' and
-                str(tds[10].text) != '-'):
-                vente = float(tds[9].text)
-                achat = float(tds[10].text)
+            if cells[9] != '-' and cells[10] != '-':
+                vente = float(cells[9])
+                achat = float(cells[10])
                 p = Option('Put', strike=strike, achat=achat, vente=vente, multiplier=multiplier)
                 self.put[float(p.strike)] = p
         return (self.call, self.put)
+
+    @instrument.timed('scrap.chain')
+    def scrap_chain(self, multiplier=1, partial=False):
+        """Same options as `scrap_options` but as one columnar `OptionChain`
+        (calls first, then puts) without building `Option` objects
+
+        :param: partial keep options quoted on one side only, NaN for the '-'
+        """
+        return chain_from_rows(self._scrap_rows(), multiplier, partial)
+
+
+def _numbers(column):
+    """Float values of a column of cells, NaN for '-' or empty cells"""
+    column = np.char.strip(np.char.replace(column, ',', ''))
+    return np.where((column == '-') | (column == ''), 'nan', column).astype(float)
+
+
+def chain_from_rows(rows, multiplier=1, partial=False):
+    """Build an `OptionChain` from the text cells of the call-put-table rows:
+    open interest/day volume/bid/ask of the call in columns 1/2/4/5, strike
+    in 7, bid/ask/day volume/open interest of the put in 9/10/12/13.
+    Options without bid or ask are skipped, or kept with NaN if partial.
+    """
+    if not rows:
+        return OptionChain([], [], [], [], multiplier)
+    table = np.array([cells[:15] for cells in rows])
+    columns = {'strike': [], 'achat': [], 'vente': [], 'cat': [],
+               'volume': [], 'open_interest': []}
+    for cat, bid, ask, volume, open_interest in ((CALL, 4, 5, 2, 1), (PUT, 9, 10, 12, 13)):
+        if partial:
+            quoted = (table[:, bid] != '-') | (table[:, ask] != '-')
+        else:
+            quoted = (table[:, bid] != '-') & (table[:, ask] != '-')
+        columns['strike'].append(table[quoted, 7].astype(float))
+        columns['achat'].append(_numbers(table[quoted, ask]))
+        columns['vente'].append(_numbers(table[quoted, bid]))
+        columns['cat'].append(np.full(quoted.sum(), cat))
+        columns['volume'].append(_numbers(table[quoted, volume]))
+        columns['open_interest'].append(_numbers(table[quoted, open_interest]))
+    return OptionChain(multiplier=multiplier,
+                       **{name: np.concatenate(values) for name, values in columns.items()})
@@ -0,0 +1,72 @@
+import re
+from html import unescape
+from html.parser import HTMLParser
+
+# 'title' parmi les classes du h1, comme find("h1", {"class": "title"}) de bs4
+TITLE = re.compile(r'<h1\b[^>]*\bclass\s*=\s*(["\'])(?:[^"\']*\s)?title(?:\s[^"\']*)?\1[^>]*>(.*?)</h1>',
+                   re.S | re.I)
+TAG = re.compile(r'<[^>]+>')
+
+
+class _Done(Exception):
+    pass
+
+
+class TableParser(HTMLParser):
+    """Streaming parser keeping only the text of the <td> of each <tr>,
+    stops at the end of the first <div> fed
+    """
+    def __init__(self):
+        super().__init__()
+        self.trs = []
+        self._depth = 0
+        self._row = None
+        self._cell = None
+
+    def handle_starttag(self, tag, attrs):
+        if tag == 'div':
+            self._depth += 1
+        elif tag == 'tr':
+            self._row = []
+        elif tag == 'td' and self._row is not None:
+            self._cell = []
+
+    def handle_endtag(self, tag):
+        if tag == 'div':
+            self._depth -= 1
+            if self._depth == 0:
+                raise _Done()
+        elif tag == 'td' and self._cell is not None:
+            self._row.append(''.join(self._cell))
+            self._cell = None
+        elif tag == 'tr' and self._row is not None:
+            self.trs.append(self._row)
+            self._row = None
+
+    def handle_data(self, data):
+        if self._cell is not None:
+            self._cell.append(data)
+
+
+def parse(content):
+    """Title and rows of the call-put-table of an Euronext page, without
+    building the tree of the whole page.
+
+    Return (title, rows), rows being the text of the cells of each option
+    row, the same as `Page.data` with the BeautifulSoup parser.
+    """
+    if isinstance(content, bytes):
+        content = content.decode('utf-8', errors='replace')
+    match = TITLE.search(content)
+    title = unescape(TAG.sub('', match.group(2))) if match else None
+    position = content.find('call-put-table')
+    if position < 0:
+        raise Exception('call-put-table not found')
+    start = content.rfind('<div', 0, position)
+    parser = TableParser()
+    try:
+        parser.feed(content[start:])
+        parser.close()
+    except _Done:
+        pass
+    return title, parser.trs[3:-1]
@@ -0,0 +1,230 @@
+"""Polling of the Euronext chains shared by every consumer: each (ticker,
+expiry) is fetched once per interval and only the changes are published.
+
+>>> feed = Feed([Ticker.CACPXA], expiries=[None, '2018-03'], interval=30)
+>>> async def alert():
+...     async for update in feed.subscribe():
+...         print(update['ticker'], update['expiry'], len(update['changed']))
+>>> async def main():
+...     await asyncio.gather(feed.run(), alert(), feed.serve(port=8765))
+>>> asyncio.run(main())
+"""
+import asyncio
+import json
+import time
+from collections import OrderedDict
+from datetime import datetime
+
+import numpy as np
+
+from chain import CATEGORIES
+from euronext import Page, Ticker
+
+EMPTY = np.array([], dtype=np.intp)
+
+
+def _full(chain):
+    """Diff of a chain seen for the first time: every option is added"""
+    return {'changed': EMPTY, 'added': np.arange(len(chain)), 'removed': EMPTY}
+
+
+def _rows(chain, index):
+    return [{'cat': CATEGORIES[chain.cat[i]],
+             'strike': float(chain.strike[i]),
+             'achat': None if np.isnan(chain.achat[i]) else float(chain.achat[i]),
+             'vente': None if np.isnan(chain.vente[i]) else float(chain.vente[i]),
+             } for i in index]
+
+
+def to_json(update):
+    """JSON line of an update: the quotes of the options changed and
+    added, the category and strike of the ones removed
+    """
+    previous = update['previous']
+    return json.dumps({'ticker': update['ticker'],
+                       'expiry': update['expiry'],
+                       'timestamp': update['timestamp'].isoformat(),
+                       'changed': _rows(update['chain'], update['changed']),
+                       'added': _rows(update['chain'], update['added']),
+                       'removed': [{'cat': row['cat'], 'strike': row['strike']}
+                                   for row in _rows(previous, update['removed'])]
+                                  if previous is not None else [],
+                       })
+
+
+class Subscription:
+    """Updates of a `Feed` for one consumer, `async for` over it.
+
+    At most one update per (ticker, expiry) waits: a newer one replaces it
+    (coalesced) and the diff is computed on delivery against the chain the
+    consumer received last, so a slow consumer skips intermediate polls but
+    never misses a change. Beyond maxsize (ticker, expiry) waiting, the
+    oldest update is dropped and its key kept in stale: the last chain of
+    the key (`Feed.chains`) is delivered first on the next iteration.
+    """
+    def __init__(self, feed, keys=None, maxsize=64):
+        self.feed = feed
+        self.keys = None if keys is None else set(keys)
+        self.maxsize = maxsize
+        self.pending = OrderedDict()
+        self.stale = OrderedDict()
+        self.delivered = {}
+        self.coalesced = 0
+        self.dropped = 0
+        self.closed = False
+        self._event = asyncio.Event()
+
+    def put(self, key, update):
+        if self.keys is not None and key not in self.keys:
+            return
+        self.stale.pop(key, None)
+        if key in self.pending:
+            del self.pending[key]
+            self.coalesced += 1
+        elif len(self.pending) >= self.maxsize:
+            dropped, _ = self.pending.popitem(last=False)
+            self.stale[dropped] = None
+            self.dropped += 1
+        self.pending[key] = update
+        self._event.set()
+
+    def close(self):
+        self.closed = True
+        self._event.set()
+        if self in self.feed.subscriptions:
+            self.feed.subscriptions.remove(self)
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        while True:
+            while not self.pending and not self.stale:
+                if self.closed:
+                    raise StopAsyncIteration
+                self._event.clear()
+                await self._event.wait()
+            if self.stale:
+                key, _ = self.stale.popitem(last=False)
+                update = self.feed.chains[key]
+            else:
+                key, update = self.pending.popitem(last=False)
+            previous = self.delivered.get(key)
+            diff = update['chain'].diff(previous) if previous is not None else _full(update['chain'])
+            self.delivered[key] = update['chain']
+            if len(diff['changed']) or len(diff['added']) or len(diff['removed']):
+                return dict(update, previous=previous, **diff)
+
+
+class Feed:
+    """Poll every (ticker, expiry) each interval seconds and publish the
+    chains that changed to the subscriptions
+
+    :param: tickers list of euronext.Ticker
+    :param: expiries list of expiry ('md' parameter of the page), None for the nearest
+    :param: fetch coroutine fetch(pages) returning one `OptionChain` or
+            exception per page, `fetcher.fetch_pages` by default
+    :param: store `store.SnapshotStore` where every chain polled is written
+    :param: kwargs options of `fetcher.fetch_pages` (concurrency, parser, multiplier, ...)
+    """
+    def __init__(self, tickers=tuple(Ticker), expiries=(None,), interval=60,
+                 fetch=None, store=None, **kwargs):
+        self.pages = OrderedDict(((ticker.name, expiry), Page(ticker=ticker, expiry=expiry))
+                                 for ticker in tickers for expiry in expiries)
+        self.interval = interval
+        self.fetch = fetch
+        self.store = store
+        self.kwargs = kwargs
+        self.chains = {}
+        self.errors = {}
+        self.subscriptions = []
+        self.polls = 0
+        self._stop = asyncio.Event()
+
+    def subscribe(self, tickers=None, expiries=None, maxsize=64):
+        """New `Subscription` to the updates of the tickers and expiries
+        (all by default). The chains already polled come first.
+        """
+        keys = [key for key in self.pages
+                if (tickers is None or key[0] in [getattr(t, 'name', t) for t in tickers])
+                and (expiries is None or key[1] in expiries)]
+        subscription = Subscription(self, keys, maxsize)
+        self.subscriptions.append(subscription)
+        for key, update in self.chains.items():
+            subscription.put(key, update)
+        return subscription
+
+    async def _fetch(self, pages):
+        if self.fetch is not None:
+            return await self.fetch(pages)
+        from fetcher import fetch_pages
+        return await fetch_pages(pages, return_exceptions=True, **self.kwargs)
+
+    async def poll(self):
+        """Fetch every page once and publish the chains that changed,
+        return the keys published
+        """
+        keys = list(self.pages)
+        chains = await self._fetch([self.pages[key] for key in keys])
+        timestamp = datetime.now()
+        self.polls += 1
+        published = []
+        for key, chain in zip(keys, chains):
+            if isinstance(chain, Exception):
+                self.errors[key] = chain
+                continue
+            self.errors.pop(key, None)
+            if self.store is not None:
+                self.store.write(chain, key[0], key[1], timestamp)
+            previous = self.chains.get(key)
+            if previous is not None:
+                diff = chain.diff(previous['chain'])
+                if not (len(diff['changed']) or len(diff['added']) or len(diff['removed'])):
+                    continue
+            update = {'ticker': key[0], 'expiry': key[1], 'timestamp': timestamp, 'chain': chain}
+            self.chains[key] = update
+            for subscription in self.subscriptions:
+                subscription.put(key, update)
+            published.append(key)
+        return published
+
+    async def run(self):
+        """Poll every interval seconds until `stop`"""
+        while not self._stop.is_set():
+            start = time.monotonic()
+            await self.poll()
+            delay = max(self.interval - (time.monotonic() - start), 0)
+            try:
+                await asyncio.wait_for(self._stop.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    def stop(self):
+        """End `run` and the subscriptions"""
+        self._stop.set()
+        for subscription in list(self.subscriptions):
+            subscription.close()
+
+    async def _client(self, reader, writer):
+        subscription = self.subscribe()
+        try:
+            async for update in subscription:
+                writer.write(to_json(update).encode() + b'\n')
+                # un client lent bloque ici, ses mises à jour sont fusionnées en attendant
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            subscription.close()
+            writer.close()
+
+    async def serve(self, path=None, host='127.0.0.1', port=None):
+        """Stream the updates as JSON lines (`to_json`) to every client of a
+        local unix socket at path, or of a TCP socket on host:port
+        """
+        if path is not None:
+            server = await asyncio.start_unix_server(self._client, path=path)
+        else:
+            server = await asyncio.start_server(self._client, host, port)
+        async with server:
+            await self._stop.wait()
@@ -0,0 +1,64 @@
+import asyncio
+
+import aiohttp
+
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+
+async def _fetch(session, semaphore, page, retries, backoff):
+    for attempt in range(retries + 1):
+        try:
+            async with semaphore:
+                async with session.get(page._url) as response:
+                    if response.status in RETRY_STATUS and attempt < retries:
+                        raise aiohttp.ClientResponseError(response.request_info,
+                                                          response.history,
+                                                          status=response.status)
+                    response.raise_for_status()
+                    return await response.read()
+        except aiohttp.ClientResponseError as error:
+            # 404, 403... : réessayer ne changera rien
+            if error.status not in RETRY_STATUS or attempt == retries:
+                raise
+        except (aiohttp.ClientError, asyncio.TimeoutError):
+            if attempt == retries:
+                raise
+        await asyncio.sleep(backoff * 2 ** attempt)
+
+
+async def fetch_pages(pages, concurrency=8, timeout=10, retries=3, backoff=0.5,
+                      multiplier=1, parser='bs4', return_exceptions=False):
+    """Download and parse many `euronext.Page` at once over one pooled session
+
+    :param: pages list of euronext.Page
+    :param: concurrency maximum number of requests in flight
+    :param: timeout total timeout in seconds of one request
+    :param: retries number of retries on network error, timeout or 429/5xx status
+    :param: backoff first delay between retries, doubled on each retry
+    :param: multiplier multiplier of the options of the chains
+    :param: parser parser of `Page.load`, 'bs4' or 'fast'
+    :param: return_exceptions return the exception of a failed page instead of raising it
+
+    Return the list of `OptionChain` in the order of pages.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    connector = aiohttp.TCPConnector(limit=concurrency)
+    client_timeout = aiohttp.ClientTimeout(total=timeout)
+
+    async def one(session, page):
+        content = await _fetch(session, semaphore, page, retries, backoff)
+        page.load(content, parser=parser)
+        return page.scrap_chain(multiplier)
+
+    async with aiohttp.ClientSession(connector=connector, timeout=client_timeout) as session:
+        return await asyncio.gather(*(one(session, page) for page in pages),
+                                    return_exceptions=return_exceptions)
+
+
+def fetch_all(pages, **kwargs):
+    """Blocking version of `fetch_pages`
+
+    >>> pages = [Page(ticker=t) for t in Ticker]
+    >>> chains = fetch_all(pages, concurrency=5)
+    """
+    return asyncio.run(fetch_pages(pages, **kwargs))
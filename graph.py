@@ -1,22 +1,33 @@
-from math import ceil
+"""Payoff charts in the iPython Notebook.
+
+matplotlib, tabulate and IPython are imported on the first chart or table
+only, importing this module costs NumPy and the strategies.
+"""
 import numpy as np
-import matplotlib.pyplot as plt
-import tabulate
 
-from matplotlib import colors as mcolors
-from IPython.display import HTML, display, Markdown
+import instrument
+from batch import StrategyBatch
+
+
+def _pyplot():
+    import matplotlib.pyplot as plt
+    return plt
+
+
+def _display_html(html):
+    from IPython.display import HTML, display
+    display(HTML(html))
+
+
+def _tabulate(rows, headers):
+    import tabulate
+    return tabulate.tabulate(rows, tablefmt='html', headers=headers)
 
 
 def rainbow_color(size):
-    """Return a color list of size element lire rainbow
-    """
-    colors = dict(mcolors.BASE_COLORS, **mcolors.CSS4_COLORS)
-    by_hsv = sorted((tuple(mcolors.rgb_to_hsv(mcolors.to_rgba(color)[:3])), name)
-                    for name, color in colors.items())
-    by_hsv = by_hsv[2:]
-    sorted_names = [name for hsv, name in by_hsv]
-    modulo = ceil(len(sorted_names) / size)
-    return sorted_names[::modulo]
+    """See `render.rainbow_color`"""
+    from render import rainbow_color
+    return rainbow_color(size)
 
 
 def display_week_summary(day, psr, deviation):
@@ -25,6 +36,7 @@ def display_week_summary(day, psr, deviation):
     psr : pivot_sr(H, B, C)
     deviation : deviation(close=4797, volatility=23.13, period=5, precision=0)
     """
+    from IPython.display import display, Markdown
     week = day.isocalendar()[1]
     display(Markdown('''### Semaine {}
 - 1 $\sigma$ [{} - {}]
@@ -52,7 +64,9 @@ class Graph:
         self.sT = np.arange(self.min,self.max, self.step)
         self.sdeviation = sdeviation
 
+    @instrument.timed('render.setup')
     def _setup_profit(self, figsize=None):
+        plt = _pyplot()
         plt.style.use('dark_background')
         if figsize:
             fig, ax = plt.subplots(figsize=figsize)
@@ -65,19 +79,25 @@ class Graph:
             plt.axvspan(self.sdeviation[0], self.sdeviation[1], facecolor='#2ca02c', alpha=0.5)
         return fig, ax
 
+    @instrument.timed('render.profit')
     def _show_profit(self, y, label, color):
+        instrument.count('points_plotted', len(self.sT))
         fig, ax = self._setup_profit()
         ax.plot(self.sT, y, label=label,color=color)
+        plt = _pyplot()
         plt.xlabel('Stock Price')
         plt.ylabel('Profit and loss')
         plt.legend(loc='best')
         plt.show()
 
+    @instrument.timed('render.compare')
     def _show_profit_compare(self, y1, label1, color1, y2, label2, color2):
+        instrument.count('points_plotted', 3 * len(self.sT))
         fig, ax = self._setup_profit()
         ax.plot(self.sT, y1, label=label1,color=color1)
         ax.plot(self.sT, y2, label=label2,color=color2)
         ax.plot(self.sT, y2-y1, dashes=[10, 5, 10, 5], label='delta', color='orange')
+        plt = _pyplot()
         plt.xlabel('Stock Price')
         plt.ylabel('Profit and loss')
         plt.legend(loc='best')
@@ -114,13 +134,14 @@ class Graph:
         detailst = [[l['cat'], l['strike'], l['direction'], l['quantity'], l['cost'], l['premium']]
                     for l in strategy.summary()]
         headers=['Category', 'strike', 'direction', 'Quantity', 'Cost', 'Premium']
-        display(HTML(tabulate.tabulate(detailst, tablefmt='html', headers=headers)))
+        _display_html(_tabulate(detailst, headers))
 
     def display_page_raw(self, page):
         headers=['Settl.C', 'OIC', 'Day Vol C', 'Last C', 'bid C', 'ask C','C',
                  'strike', 'P', 'bid P', 'ask P', 'Last P', 'Day Vol P', 'OIP', 'Settl.P']
-        display(HTML(tabulate.tabulate(page.data, tablefmt='html', headers=headers)))
+        _display_html(_tabulate(page.data, headers))
 
+    @instrument.timed('render.rainbow')
     def profit_rainbow(self, assets, direction, title=None):
         """
         :param assets: list of options or strategies to graph
@@ -128,6 +149,7 @@ class Graph:
 
         >>> g.profit_rainbow(put.values,'short')
         """
+        instrument.count('points_plotted', len(assets) * len(self.sT))
         assets_color = [(key, value)
                       for key, value
                       in zip(assets, rainbow_color(len(assets)))]
@@ -136,9 +158,29 @@ class Graph:
             y = asset.payoff(self.sT, direction)
             label = '#{:02} {}'.format(idx, asset.label)
             ax.plot(self.sT, y, label=label,color=color)
+        plt = _pyplot()
         plt.xlabel('Stock Price')
         plt.ylabel('Profit and loss')
         plt.legend(loc='best')
         if title:
             plt.title(title)
-        plt.show()
\ No newline at end of file
+        plt.show()
+
+    def render_rainbow(self, assets, direction='long', path=None, title=None, renderer=None):
+        """Headless version of `profit_rainbow`, written to path without pyplot
+        nor IPython, see `render.Renderer.rainbow`
+
+        :param: assets list of options or strategies, or a StrategyBatch
+        :param: renderer Renderer to reuse its figure between charts
+
+        >>> g.render_rainbow(Butterfly.explorator(list(call.values())), path='butterfly.png')
+        """
+        from render import Renderer
+        renderer = renderer or Renderer(figsize=(12, 10))
+        if isinstance(assets, StrategyBatch):
+            payoffs, labels = assets.payoff(self.sT), assets.labels
+        else:
+            payoffs = np.array([asset.payoff(self.sT, direction) for asset in assets])
+            labels = [asset.label for asset in assets]
+        return renderer.rainbow(self.sT, payoffs, labels, path=path, title=title,
+                                sdeviation=self.sdeviation)
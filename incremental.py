@@ -0,0 +1,121 @@
+import numpy as np
+
+from analytics import payoff_analytics
+from batch import StrategyBatch
+from scanner import KEYS
+
+
+def _keys(chain, cols=None):
+    """Key of each option, the same for the same category and strike"""
+    cols = np.arange(len(chain)) if cols is None else cols
+    return chain.cat[cols] * 1e12 + chain.strike[cols]
+
+
+class Tracker:
+    """Scores and ranking of the strategies of a `StrategyBatch` kept up to
+    date between polls of the chain.
+
+    On `update`, the new chain is diffed with the previous one and only the
+    strategies having a leg whose quotes changed are repriced and rescored.
+    A strategy whose leg is no longer quoted gets a score of -inf until the
+    option comes back.
+
+    >>> tracker = Tracker.from_candidates(Scanner(chain).top(1000), chain, top=20)
+    >>> page.fetch(); feed = tracker.update(page.scrap_chain())
+    >>> feed['moves']
+    [{'row': 12, 'label': 'Butterfly ...', 'old_rank': 3, 'new_rank': 0, 'score': 4.2}, ...]
+    """
+    def __init__(self, batch, key='ratio', top=None):
+        self.batch = batch
+        self.key = KEYS[key] if isinstance(key, str) else key
+        self.top = top
+        self._leg_keys = _keys(batch.chain, batch.cols)
+        self.missing = np.zeros(len(batch), dtype=bool)
+        self._rebuild(batch.chain)
+
+    @classmethod
+    def from_candidates(cls, candidates, chain, **kwargs):
+        """Track `scanner.Candidate` found on chain"""
+        candidates = list(candidates)
+        rows = np.repeat(np.arange(len(candidates)), [len(c.cols) for c in candidates])
+        cols = np.concatenate([c.cols for c in candidates])
+        quantities = np.concatenate([c.quantities for c in candidates])
+        batch = StrategyBatch(chain, rows, cols, quantities, labels=[c.label for c in candidates])
+        return cls(batch, **kwargs)
+
+    def _rebuild(self, chain):
+        """Map the legs on the options of chain and score every strategy"""
+        keys = _keys(chain)
+        sorter = np.argsort(keys)
+        position = np.clip(np.searchsorted(keys, self._leg_keys, sorter=sorter), 0, len(keys) - 1)
+        cols = sorter[position]
+        found = keys[cols] == self._leg_keys
+        batch = self.batch
+        self.batch = StrategyBatch(chain, batch.rows, np.where(found, cols, 0),
+                                   batch.quantities, labels=batch.labels)
+        self.missing = np.zeros(len(batch), dtype=bool)
+        self.missing[batch.rows[~found]] = True
+        self._cols, self._quantities = self.batch.padded_legs()
+        self.scores = self._score(np.arange(len(self.batch)))
+        self.ranking = self._rank()
+
+    def _score(self, rows):
+        chain = self.batch.chain
+        cols = self._cols[rows]
+        weight = self._quantities[rows] * chain.multiplier[cols]
+        cost = self.batch.cost[rows]
+        result = payoff_analytics(chain.strike[cols], chain.sign[cols], weight, cost)
+        scores = {'cost': cost,
+                  'max_profit': result['max_profit'],
+                  'max_loss': result['max_loss'],
+                  'breakevens': result['breakevens'],
+                  }
+        scores['score'] = np.where(self.missing[rows], -np.inf, self.key(scores))
+        return scores
+
+    def _rank(self):
+        order = np.argsort(-self.scores['score'], kind='stable')
+        order = order[~self.missing[order]]
+        return order[:self.top] if self.top else order
+
+    def _moves(self, before, after):
+        old = {row: rank for rank, row in enumerate(before)}
+        new = {row: rank for rank, row in enumerate(after)}
+        moves = []
+        for row in sorted(set(old) | set(new), key=lambda row: new.get(row, len(new))):
+            if old.get(row) != new.get(row):
+                moves.append({'row': int(row),
+                              'label': self.batch.labels[row],
+                              'old_rank': old.get(row),
+                              'new_rank': new.get(row),
+                              'score': float(self.scores['score'][row]),
+                              })
+        return moves
+
+    def update(self, chain):
+        """Take the quotes of a new snapshot of the chain
+
+        Return the change feed, a dict with:
+        - changed: index in chain of the options whose quotes changed
+        - recomputed: index of the strategies repriced
+        - moves: strategies whose rank changed, old_rank/new_rank being None
+          when out of the ranking
+        """
+        diff = chain.diff(self.batch.chain)
+        before = self.ranking
+        if not chain.same_layout(self.batch.chain):
+            # options ajoutées, retirées ou réordonnées : les colonnes du batch
+            # ne désignent plus les mêmes options, tout est recalculé
+            self._rebuild(chain)
+            recomputed = np.arange(len(self.batch))
+        else:
+            recomputed = self.batch.reprice(chain, diff['changed'])
+            if len(recomputed):
+                fresh = self._score(recomputed)
+                for name, value in fresh.items():
+                    self.scores[name][recomputed] = value
+            self.ranking = self._rank()
+        return {'changed': diff['changed'],
+                'recomputed': recomputed,
+                'moves': self._moves(before, self.ranking),
+                }
@@ -0,0 +1,147 @@
+"""Per-stage timers and counters of the fetch, parse, evaluate and render steps.
+
+Disabled by default: `stage` then returns a shared no-op context manager,
+`timed` functions only test a flag and `count` returns at once.
+
+>>> import instrument
+>>> instrument.enable()
+>>> page.fetch(); page.scrap_options()
+>>> instrument.report()
+{'stages': {'fetch': {...}, 'parse': {...}}, 'counters': {'pages_fetched': 1, 'rows_parsed': 120}}
+>>> instrument.to_chrome_trace('trace.json')   # open in chrome://tracing
+"""
+import functools
+import json
+import os
+import threading
+import time
+
+enabled = False
+trace = True
+stages = {}
+counters = {}
+events = []
+
+
+def enable(with_trace=True):
+    """Start recording, with_trace keeps every timed call for `to_chrome_trace`"""
+    global enabled, trace
+    enabled = True
+    trace = with_trace
+
+
+def disable():
+    global enabled
+    enabled = False
+
+
+def reset():
+    stages.clear()
+    counters.clear()
+    del events[:]
+
+
+def count(name, n=1):
+    """Add n to the counter name"""
+    if not enabled:
+        return
+    counters[name] = counters.get(name, 0) + n
+
+
+def _record(name, start, end):
+    duration = end - start
+    stat = stages.get(name)
+    if stat is None:
+        stages[name] = {'count': 1, 'total': duration, 'min': duration, 'max': duration}
+    else:
+        stat['count'] += 1
+        stat['total'] += duration
+        stat['min'] = min(stat['min'], duration)
+        stat['max'] = max(stat['max'], duration)
+    if trace:
+        events.append((name, start, duration, threading.get_ident()))
+
+
+class _Stage:
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        _record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class _NoStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NO_STAGE = _NoStage()
+
+
+def stage(name):
+    """Context manager timing its block as the stage name
+
+    >>> with instrument.stage('screen'):
+    ...     scanner.top(10)
+    """
+    return _Stage(name) if enabled else _NO_STAGE
+
+
+def timed(name):
+    """Decorator timing every call of the function as the stage name"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _record(name, start, time.perf_counter())
+        return wrapper
+    return decorator
+
+
+def report():
+    """Stages (count, total, min, max, mean in seconds) and counters"""
+    return {'stages': {name: dict(stat, mean=stat['total'] / stat['count'])
+                       for name, stat in stages.items()},
+            'counters': dict(counters),
+            }
+
+
+def to_json(path=None):
+    """`report` as JSON, written to path when given"""
+    text = json.dumps(report(), indent=2, sort_keys=True)
+    if path:
+        with open(path, 'w') as f:
+            f.write(text)
+    return text
+
+
+def to_chrome_trace(path=None):
+    """Timed calls in the Chrome trace event format (chrome://tracing, Perfetto)"""
+    pid = os.getpid()
+    trace_events = [{'name': name, 'cat': name.split('.')[0], 'ph': 'X',
+                     'ts': start * 1e6, 'dur': duration * 1e6, 'pid': pid, 'tid': tid}
+                    for name, start, duration, tid in events]
+    trace_events += [{'name': name, 'ph': 'C', 'ts': 0, 'pid': pid,
+                      'args': {name: value}} for name, value in counters.items()]
+    document = {'traceEvents': trace_events, 'displayTimeUnit': 'ms'}
+    if path:
+        with open(path, 'w') as f:
+            json.dump(document, f)
+    return document
@@ -0,0 +1,101 @@
+"""Fused payoff at expiry of many legs over a price grid:
+
+    payoff(sT) = sum_i weight_i * max(sign_i * (sT - strike_i), 0) - cost
+
+sign is +1 for a call and -1 for a put, weight the signed quantity times
+the multiplier and cost the premiums paid.
+
+Two backends compute it without a temporary array per leg:
+- 'numba': one compiled loop over sT, each price read and written once
+- 'numpy': ufuncs with out= buffers, sT being processed in blocks small
+  enough to stay in cache
+
+numba is used when installed, `set_backend` forces one of them.
+
+>>> kernels.payoff(g.sT, strike=[4900, 5000, 5100], sign=[1, 1, 1], weight=[10, -20, 10], cost=35)
+"""
+import numpy as np
+
+BACKENDS = ('numpy', 'numba')
+BLOCK = 8192
+
+_backend = None
+_numba_payoff = None
+
+
+def _kernel(sT, strike, sign, weight, cost, out):
+    for j in range(sT.size):
+        total = -cost
+        for i in range(strike.size):
+            value = sign[i] * (sT[j] - strike[i])
+            if value > 0:
+                total += weight[i] * value
+        out[j] = total
+
+
+def _compile():
+    """numba kernel, compiled on the first use only as numba is long to import"""
+    global _numba_payoff
+    if _numba_payoff is None:
+        import numba
+        _numba_payoff = numba.njit(cache=True, nogil=True)(_kernel)
+    return _numba_payoff
+
+
+def set_backend(name=None):
+    """Use the backend name, 'numpy' or 'numba', None to pick numba when installed"""
+    global _backend
+    if name is None:
+        try:
+            _compile()
+            name = 'numba'
+        except ImportError:
+            name = 'numpy'
+    elif name == 'numba':
+        _compile()
+    elif name != 'numpy':
+        raise Exception('backend "{}" is not good'.format(name))
+    _backend = name
+
+
+def get_backend():
+    if _backend is None:
+        set_backend()
+    return _backend
+
+
+def _numpy_payoff(sT, strike, sign, weight, cost, out):
+    buffer = np.empty(min(BLOCK, sT.size))
+    for start in range(0, sT.size, BLOCK):
+        prices = sT[start:start + BLOCK]
+        total = out[start:start + BLOCK]
+        value = buffer[:prices.size]
+        total.fill(-cost)
+        for k, w, s in zip(strike, weight, sign):
+            np.subtract(prices, k, out=value)
+            if s < 0:
+                np.negative(value, out=value)
+            np.maximum(value, 0.0, out=value)
+            value *= w
+            total += value
+
+
+def payoff(sT, strike, sign, weight, cost=0.0, out=None):
+    """Payoff of the legs (strike, sign, weight) for every price of sT, less
+    cost, with the shape of sT. out, a contiguous float array of the size
+    of sT, receives the result when given.
+    """
+    sT = np.asarray(sT, dtype=float)
+    shape = sT.shape
+    sT = np.ascontiguousarray(sT).ravel()
+    strike = np.ascontiguousarray(strike, dtype=float).ravel()
+    sign = np.ascontiguousarray(sign, dtype=float).ravel()
+    weight = np.ascontiguousarray(weight, dtype=float).ravel()
+    result = np.empty(sT.size) if out is None else out.reshape(-1)
+    if get_backend() == 'numba':
+        _numba_payoff(sT, strike, sign, weight, float(cost), result)
+    else:
+        _numpy_payoff(sT, strike, sign, weight, float(cost), result)
+    if out is not None:
+        return out
+    return result.reshape(shape) if shape else result[0]
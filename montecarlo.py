@@ -0,0 +1,161 @@
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from batch import StrategyBatch
+from strategy import Strategy
+
+MAX_CELLS = 2 ** 24
+
+
+def gbm_prices(rng, spot, T, sigma, r=0.0, q=0.0, size=1):
+    """Terminal prices of a geometric brownian motion"""
+    drift = (r - q - 0.5 * sigma * sigma) * T
+    return spot * np.exp(drift + sigma * np.sqrt(T) * rng.standard_normal(size))
+
+
+def bootstrap_prices(rng, spot, returns, periods, size=1):
+    """Terminal prices after `periods` log returns drawn with replacement
+    from the historical returns
+    """
+    returns = np.asarray(returns, dtype=float)
+    total = np.zeros(size)
+    for _ in range(periods):
+        total += returns[rng.integers(len(returns), size=size)]
+    return spot * np.exp(total)
+
+
+def _price_range(spot, T, sigma, r, q, returns, periods):
+    """Range of terminal prices where the histograms are built"""
+    if returns is not None:
+        returns = np.asarray(returns, dtype=float)
+        return spot * np.exp(periods * returns.min()), spot * np.exp(periods * returns.max())
+    drift = (r - q - 0.5 * sigma * sigma) * T
+    width = 8 * sigma * np.sqrt(T)
+    return spot * np.exp(drift - width), spot * np.exp(drift + width)
+
+
+def _pnl_range(batch, low, high):
+    """Min and max P&L of each strategy for prices in [low, high]: payoffs
+    are piecewise linear so they are reached at the bounds or at a strike
+    """
+    strikes = batch.chain.strike
+    prices = np.unique(np.concatenate([[low, high], strikes[(strikes > low) & (strikes < high)]]))
+    payoff = batch.payoff(prices)
+    low, high = payoff.min(axis=1), payoff.max(axis=1)
+    high = np.where(high > low, high, low + 1)
+    return low, high
+
+
+def _simulate_chunk(job):
+    batch, seed, size, model, ranges, bins = job
+    rng = np.random.default_rng(seed)
+    if model['returns'] is not None:
+        prices = bootstrap_prices(rng, model['spot'], model['returns'], model['periods'], size)
+    else:
+        prices = gbm_prices(rng, model['spot'], model['T'], model['sigma'],
+                            model['r'], model['q'], size)
+    pnl = batch.payoff(prices)
+    low, high = ranges
+    index = ((pnl - low[:, None]) / (high - low)[:, None] * bins).astype(np.intp)
+    np.clip(index, 0, bins - 1, out=index)
+    index += np.arange(len(batch))[:, None] * bins
+    histogram = np.bincount(index.ravel(), minlength=len(batch) * bins)
+    return {'sum': pnl.sum(axis=1),
+            'sum2': (pnl * pnl).sum(axis=1),
+            'profit': (pnl > 0).sum(axis=1),
+            'histogram': histogram.reshape(len(batch), bins),
+            }
+
+
+def simulate(strategies, spot, T=None, sigma=None, r=0.0, q=0.0, returns=None,
+             periods=None, n_paths=1000000, chunk=65536, bins=400, level=0.95,
+             seed=None, workers=1):
+    """Distribution of the P&L at expiry of strategies over simulated terminal prices
+
+    Prices are drawn by chunks of `chunk` paths and each chunk is reduced to
+    sums and a histogram per strategy before the next one, so memory does not
+    depend on n_paths. The result does not depend on workers: each chunk has
+    its own seed spawned from seed.
+
+    :param: strategies Strategy, list of Strategy or StrategyBatch
+    :param: spot, T, sigma, r, q parameters of the GBM (T in years, sigma 0.2 for 20%)
+    :param: returns, periods historical log returns to bootstrap instead of the GBM,
+            periods being the number of returns until expiry
+    :param: level confidence level of the VaR and CVaR
+    :param: workers number of processes, chunks are spread over them
+
+    Return a dict of arrays, one value per strategy: expected, std,
+    probability_of_profit, var, cvar (losses as positive amounts, read on
+    the histogram so precise to a bin), histogram and edges (bins of the
+    histogram of each strategy)
+
+    >>> result = simulate(Butterfly.explorator(list(call.values())), 5000, T=30 / 365, sigma=0.2)
+    >>> best = np.argsort(-result['expected'])
+    """
+    if n_paths < 1:
+        raise Exception('n_paths "{}" is not good'.format(n_paths))
+    if isinstance(strategies, Strategy):
+        strategies = [strategies]
+    if not isinstance(strategies, StrategyBatch):
+        strategies = StrategyBatch.from_strategies(strategies)
+    batch = strategies
+    if returns is None and (T is None or sigma is None):
+        raise Exception('T and sigma are needed without historical returns')
+    if returns is not None and not periods:
+        raise Exception('periods is needed with historical returns')
+    chunk = max(1024, min(chunk, MAX_CELLS // max(len(batch), 1)))
+    model = {'spot': spot, 'T': T, 'sigma': sigma, 'r': r, 'q': q,
+             'returns': returns, 'periods': periods}
+    ranges = _pnl_range(batch, *_price_range(spot, T, sigma, r, q, returns, periods))
+    sizes = [chunk] * (n_paths // chunk) + ([n_paths % chunk] if n_paths % chunk else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    jobs = [(batch, s, size, model, ranges, bins) for s, size in zip(seeds, sizes)]
+    if workers == 1:
+        parts = map(_simulate_chunk, jobs)
+        total = _merge(parts)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            total = _merge(executor.map(_simulate_chunk, jobs))
+    return _statistics(total, ranges, bins, n_paths, level)
+
+
+def _merge(parts):
+    total = None
+    for part in parts:
+        if total is None:
+            total = part
+        else:
+            for name, value in part.items():
+                total[name] += value
+    return total
+
+
+def _statistics(total, ranges, bins, n_paths, level):
+    low, high = ranges
+    edges = low[:, None] + (high - low)[:, None] * np.linspace(0, 1, bins + 1)
+    centers = (edges[:, :-1] + edges[:, 1:]) / 2
+    histogram = total['histogram']
+    expected = total['sum'] / n_paths
+    variance = np.maximum(total['sum2'] / n_paths - expected * expected, 0)
+    # VaR : perte au quantile 1 - level, interpolé dans le bin de l'histogramme cumulé
+    cumulative = np.cumsum(histogram, axis=1) / n_paths
+    tail = np.argmax(cumulative >= 1 - level, axis=1)
+    rows = np.arange(len(tail))
+    before = cumulative[rows, tail] - histogram[rows, tail] / n_paths
+    fraction = (1 - level - before) / np.maximum(histogram[rows, tail] / n_paths, 1e-300)
+    quantile = edges[rows, tail] + fraction * (edges[rows, tail + 1] - edges[rows, tail])
+    # CVaR : moyenne des bins sous le quantile et de la partie du bin du quantile
+    below = np.arange(bins)[None, :] < tail[:, None]
+    tail_sum = (histogram * centers * below).sum(axis=1) / n_paths
+    tail_sum += (1 - level - before) * (edges[rows, tail] + quantile) / 2
+    var = -quantile
+    cvar = -tail_sum / (1 - level)
+    return {'expected': expected,
+            'std': np.sqrt(variance),
+            'probability_of_profit': total['profit'] / n_paths,
+            'var': var,
+            'cvar': cvar,
+            'histogram': histogram,
+            'edges': edges,
+            }
@@ -0,0 +1,132 @@
+"""Positions held across expiries, netted by option and valued together
+over scenario grids of spot, volatility and time.
+"""
+import numpy as np
+
+from pricing import black_scholes, black76
+from product import Direction, Option
+
+DAYS_PER_YEAR = 365
+
+
+def _price(model, w, S, K, T, r, sigma, q):
+    if model == 'bs':
+        return black_scholes(w, S, K, T, r, sigma, q)['price']
+    elif model == 'black76':
+        return black76(w, S, K, T, r, sigma)['price']
+    raise Exception('model "{}" is not good'.format(model))
+
+
+class Portfolio:
+    """Strategies and options held until their expiry T (in years). Legs on
+    the same option (category, strike, multiplier and expiry) are netted, so
+    a scenario prices each option once whatever the number of positions.
+
+    >>> book = Portfolio()
+    >>> book.add(IronCondor(put[4600], put[4700], call[5300], call[5400]), T=30 / 365)
+    >>> book.add(Butterfly(call[4900], call[5000], call[5100]), T=58 / 365, quantity=2)
+    >>> grid = book.scenarios(np.linspace(4000, 6000, 201), sigma=0.2,
+    ...                       vol_shifts=[-0.05, 0, 0.05], days=[0, 7, 30])
+    >>> grid['pnl'].shape
+    (201, 3, 3)
+    >>> book.worst_case(5000, sigma=0.2)
+    {'loss': ..., 'spot': ..., 'vol_shift': ..., 'days': ..., 'value': ...}
+    """
+    def __init__(self):
+        self.positions = []
+        self.cost = 0.0
+        self._legs = {}
+
+    def add(self, position, T, quantity=1, direction='long'):
+        """Hold quantity of position, a `Strategy` or an `Option` bought or
+        sold according to direction, expiring in T years
+        """
+        if isinstance(position, Option):
+            legs = [(position, Direction.of(direction), 1)]
+            cost = position.cost(direction)
+        else:
+            legs = position.legs()
+            cost = position.cost()
+        for option, sign, leg_quantity in legs:
+            key = (option.cat, float(option.strike), float(option.multiplier), float(T))
+            self._legs[key] = self._legs.get(key, 0.0) + sign * leg_quantity * quantity
+        self.cost += cost * quantity
+        self.positions.append((getattr(position, 'label', str(position)), T, quantity))
+        return self
+
+    def __len__(self):
+        return len(self.positions)
+
+    def legs(self):
+        """Netted legs as arrays: sign (+1 call, -1 put), strike, multiplier,
+        T and signed quantity, legs netted to 0 left out
+        """
+        legs = [(key, quantity) for key, quantity in self._legs.items() if quantity != 0]
+        if not legs:
+            empty = np.zeros(0)
+            return {'sign': empty, 'strike': empty, 'multiplier': empty,
+                    'T': empty, 'quantity': empty}
+        keys, quantities = zip(*legs)
+        cat, strike, multiplier, T = zip(*keys)
+        return {'sign': np.where(np.array(cat) == 'Call', 1.0, -1.0),
+                'strike': np.array(strike),
+                'multiplier': np.array(multiplier),
+                'T': np.array(T),
+                'quantity': np.array(quantities)}
+
+    def value(self, spot, sigma, r=0.0, q=0.0, days=0, model='bs'):
+        """Market value of the netted legs, sigma being a scalar or one
+        volatility per leg of `legs`
+        """
+        value = self.scenarios(spot, sigma, r=r, q=q, days=[days], model=model)['value'][:, 0, 0]
+        return float(value[0]) if np.ndim(spot) == 0 else value
+
+    def scenarios(self, spots, sigma, vol_shifts=(0.0,), days=(0,), r=0.0, q=0.0, model='bs'):
+        """Value and P&L of the whole portfolio on the grid spots x vol_shifts x days,
+        every leg and scenario priced in one broadcast
+
+        :param: spots prices of the underlying
+        :param: sigma volatility, a scalar or one per leg of `legs`
+        :param: vol_shifts added to sigma (0.05 for +5 points)
+        :param: days days elapsed, the legs expired by then are worth their intrinsic value
+        :param: model 'bs' (spots of the underlying) or 'black76' (future prices)
+
+        Return a dict with the axes and arrays of shape (len(spots), len(vol_shifts), len(days)):
+        - value: market value of the legs
+        - pnl: value less the premiums paid on entry (`Strategy.payoff` at expiry)
+        """
+        spots = np.atleast_1d(np.asarray(spots, dtype=float))
+        vol_shifts = np.atleast_1d(np.asarray(vol_shifts, dtype=float))
+        days = np.atleast_1d(np.asarray(days, dtype=float))
+        legs = self.legs()
+        # axes (leg, spot, vol_shift, day)
+        column = lambda values: np.broadcast_to(values, legs['strike'].shape)[:, None, None, None]
+        T = np.maximum(column(legs['T']) - days[None, None, None, :] / DAYS_PER_YEAR, 0.0)
+        volatility = np.maximum(column(np.asarray(sigma, dtype=float)) +
+                                vol_shifts[None, None, :, None], 0.0)
+        price = _price(model, column(legs['sign']), spots[None, :, None, None],
+                       column(legs['strike']), T, r, volatility, q)
+        weight = legs['quantity'] * legs['multiplier']
+        value = np.tensordot(weight, price, axes=1)
+        return {'spots': spots, 'vol_shifts': vol_shifts, 'days': days,
+                'value': value, 'pnl': value - self.cost}
+
+    def worst_case(self, spot, sigma, moves=np.linspace(-0.15, 0.15, 13),
+                   vol_shifts=(-0.05, 0.0, 0.05), days=(0,), r=0.0, q=0.0, model='bs'):
+        """Margin-like risk: largest loss of market value from the current one
+        over the spot moves (relative, 0.1 for +10%), vol_shifts and days
+
+        Return a dict: loss (positive amount, 0 if no scenario loses),
+        the spot, vol_shift and days of the worst scenario and the current value
+        """
+        spots = spot * (1 + np.asarray(moves, dtype=float))
+        current = self.value(spot, sigma, r, q, model=model)
+        grid = self.scenarios(spots, sigma, vol_shifts, days, r, q, model)
+        change = grid['value'] - current
+        i, j, k = np.unravel_index(np.argmin(change), change.shape)
+        return {'loss': float(max(-change[i, j, k], 0.0)),
+                'spot': float(spots[i]),
+                'vol_shift': float(grid['vol_shifts'][j]),
+                'days': float(grid['days'][k]),
+                'value': float(current),
+                }
@@ -0,0 +1,128 @@
+"""Black-Scholes and Black-76 prices and Greeks computed on whole arrays.
+
+`w` is +1 for a call and -1 for a put (`OptionChain.sign`), every other
+argument is a scalar or an array broadcastable with the others.
+T is in years, r, q and sigma are annual rates (0.2 for 20%).
+vega is for 1.00 of volatility and theta is per year.
+"""
+import numpy as np
+
+from batch import StrategyBatch
+
+
+def _erfcc(x):
+    """Complementary error function (Numerical Recipes erfcc), relative
+    error below 1.2e-7 everywhere, used when scipy is not installed
+    """
+    x = np.asarray(x, dtype=float)
+    z = np.abs(x)
+    t = 1.0 / (1.0 + 0.5 * z)
+    poly = (-z * z - 1.26551223 + t * (1.00002368 + t * (0.37409196 + t * (0.09678418 +
+            t * (-0.18628806 + t * (0.27886807 + t * (-1.13520398 + t * (1.48851587 +
+            t * (-0.82215223 + t * 0.17087277)))))))))
+    value = t * np.exp(poly)
+    return np.where(x >= 0, value, 2.0 - value)
+
+
+_erfc = None
+
+
+def erfc(x):
+    """Complementary error function, scipy.special.erfc when installed,
+    imported on the first call only as scipy is long to import
+    """
+    global _erfc
+    if _erfc is None:
+        try:
+            from scipy.special import erfc as _erfc
+        except ImportError:
+            _erfc = _erfcc
+    return _erfc(x)
+
+
+SQRT2 = np.sqrt(2.0)
+SQRT2PI = np.sqrt(2.0 * np.pi)
+GREEKS = ('price', 'delta', 'gamma', 'vega', 'theta')
+
+
+def norm_cdf(x):
+    return 0.5 * erfc(-np.asarray(x, dtype=float) / SQRT2)
+
+
+def norm_pdf(x):
+    x = np.asarray(x, dtype=float)
+    return np.exp(-0.5 * x * x) / SQRT2PI
+
+
+def black_scholes(w, S, K, T, r, sigma, q=0.0):
+    """Price and Greeks of European options on a spot S paying a dividend yield q
+
+    Return a dict of arrays: price, delta, gamma, vega, theta
+    """
+    w, S, K, T, r, sigma, q = np.broadcast_arrays(*(np.asarray(v, dtype=float)
+                                                    for v in (w, S, K, T, r, sigma, q)))
+    alive = (T > 0) & (sigma > 0)
+    # valeurs factices pour les options expirées, remplacées plus bas
+    T_ = np.where(alive, T, 1.0)
+    sigma_ = np.where(alive, sigma, 1.0)
+    sqrt_T = np.sqrt(T_)
+    vol = sigma_ * sqrt_T
+    d1 = (np.log(S / K) + (r - q + 0.5 * sigma_ * sigma_) * T_) / vol
+    d2 = d1 - vol
+    spot = S * np.exp(-q * T_)
+    strike = K * np.exp(-r * T_)
+    n_d1 = norm_pdf(d1)
+    N_d1 = norm_cdf(w * d1)
+    N_d2 = norm_cdf(w * d2)
+    greeks = {'price': w * (spot * N_d1 - strike * N_d2),
+              'delta': w * np.exp(-q * T_) * N_d1,
+              'gamma': spot * n_d1 / (S * S * vol),
+              'vega': spot * n_d1 * sqrt_T,
+              'theta': (-spot * n_d1 * sigma_ / (2 * sqrt_T)
+                        - w * r * strike * N_d2 + w * q * spot * N_d1),
+              }
+    expired = {'price': np.maximum(w * (S - K), 0),
+               'delta': np.where(w * (S - K) > 0, w, 0.0),
+               'gamma': np.zeros_like(S),
+               'vega': np.zeros_like(S),
+               'theta': np.zeros_like(S),
+               }
+    return {name: np.where(alive, greeks[name], expired[name]) for name in GREEKS}
+
+
+def black76(w, F, K, T, r, sigma):
+    """Price and Greeks of European options on a future F, delta is dPrice/dF"""
+    return black_scholes(w, F, K, T, r, sigma, q=r)
+
+
+def chain_greeks(chain, underlying, T, r, sigma, q=0.0, model='bs'):
+    """Price and Greeks of one unit of every option of an `OptionChain`
+
+    :param: underlying spot for 'bs', future price for 'black76'
+    :param: sigma volatility, scalar or one per option of the chain
+    :param: model 'bs' or 'black76'
+    """
+    if model == 'bs':
+        return black_scholes(chain.sign, underlying, chain.strike, T, r, sigma, q)
+    elif model == 'black76':
+        return black76(chain.sign, underlying, chain.strike, T, r, sigma)
+    raise Exception('model "{}" is not good'.format(model))
+
+
+def batch_greeks(batch, underlying, T, r, sigma, q=0.0, model='bs'):
+    """Greeks of every strategy of a `StrategyBatch`, legs weighted by
+    their signed quantity and multiplier, one array of len(batch) per Greek
+    """
+    greeks = chain_greeks(batch.chain, underlying, T, r, sigma, q, model)
+    weights = batch.weights * batch.chain.multiplier
+    return {name: weights @ value for name, value in greeks.items()}
+
+
+def strategy_greeks(strategy, underlying, T, r, sigma, q=0.0, model='bs'):
+    """Aggregated Greeks of a `Strategy`, sigma being a scalar
+
+    >>> strategy_greeks(Butterfly(call[4900], call[5000], call[5100]), 5000, 30 / 365, 0.01, 0.2)
+    """
+    batch = StrategyBatch.from_strategies([strategy])
+    greeks = batch_greeks(batch, underlying, T, r, sigma, q, model)
+    return {name: float(value[0]) for name, value in greeks.items()}
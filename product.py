@@ -1,8 +1,31 @@
-import numpy as np
+from enum import IntEnum
 from math import ceil, floor
 
+import kernels
+
+
+class Direction(IntEnum):
+    """Direction of a position, its value is the sign of the quantity"""
+    LONG = 1
+    SHORT = -1
+
+    @classmethod
+    def of(cls, direction):
+        """Direction from 'long', 'short' or a Direction"""
+        if direction == 'long':
+            return cls.LONG
+        elif direction == 'short':
+            return cls.SHORT
+        elif isinstance(direction, cls):
+            return direction
+        raise Exception('direction "{}" is not good'.format(direction))
+
+    def __str__(self):
+        return self.name.lower()
+
 
 class Option:
+    __slots__ = ('cat', 'strike', 'achat', 'vente', 'multiplier')
 
     def __init__(self, cat='Call', strike=0, achat=0, vente=0, multiplier=1):
         self.cat = cat
@@ -30,27 +53,24 @@ class Option:
 
     def _payoff(self, sT, premium, multiplier):
         if self.cat == 'Call':
-            return (np.where(sT > self.strike, sT - self.strike, 0) - premium) * multiplier
+            sign = 1
         elif self.cat == 'Put':
-            return (np.where(sT < self.strike, self.strike - sT, 0) - premium) * multiplier
+            sign = -1
+        else:
+            return None
+        return kernels.payoff(sT, self.strike, sign, multiplier, premium * multiplier)
 
     def payoff(self, sT, direction):
-        if direction == 'long':
+        if Direction.of(direction) > 0:
             return self.payoff_long(sT)
-        elif direction == 'short':
-            return self.payoff_short(sT)
-        raise Exception('direction "{}" is not good'.format(direction))
+        return self.payoff_short(sT)
 
     def cost(self, direction):
-        if direction == 'long':
+        if Direction.of(direction) > 0:
             return self.multiplier * self.achat
-        elif direction == 'short':
-            return -self.multiplier * self.vente
-        raise Exception('direction "{}" is not good {}'.format(direction))
+        return -self.multiplier * self.vente
 
     def premium(self, direction):
-        if direction == 'long':
+        if Direction.of(direction) > 0:
             return self.achat
-        elif direction == 'short':
-            return -self.vente
-        raise Exception('direction "{}" is not good {}'.format(direction))
+        return -self.vente
@@ -0,0 +1,114 @@
+"""Headless rendering of payoffs straight to PNG/SVG files with the Agg
+backend, without pyplot nor IPython.
+"""
+from math import ceil
+
+import numpy as np
+from matplotlib import colors as mcolors
+from matplotlib import rc_context, style
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.collections import LineCollection
+from matplotlib.figure import Figure
+
+import instrument
+
+
+def rainbow_color(size):
+    """Return a color list of size element lire rainbow
+    """
+    colors = dict(mcolors.BASE_COLORS, **mcolors.CSS4_COLORS)
+    by_hsv = sorted((tuple(mcolors.rgb_to_hsv(mcolors.to_rgba(color)[:3])), name)
+                    for name, color in colors.items())
+    by_hsv = by_hsv[2:]
+    sorted_names = [name for hsv, name in by_hsv]
+    modulo = ceil(len(sorted_names) / size)
+    return sorted_names[::modulo]
+
+
+def decimate(x, Y, width):
+    """Keep at most 2 * width points per row of Y: the min and the max of
+    each of width buckets of x, in their order, so peaks and kinks remain
+    visible at an output of width pixels.
+
+    Return X, Y of shape (len(Y), n_points)
+    """
+    Y = np.atleast_2d(Y)
+    n = len(x)
+    if n <= 2 * width:
+        return np.broadcast_to(x, Y.shape), Y
+    size = n // width
+    used = size * width
+    buckets = Y[:, :used].reshape(len(Y), width, size)
+    low = buckets.argmin(axis=2)
+    high = buckets.argmax(axis=2)
+    index = np.sort(np.stack([low, high], axis=2), axis=2)
+    index = (index + (np.arange(width) * size)[None, :, None]).reshape(len(Y), -1)
+    # le reste qui ne remplit pas un bucket est gardé tel quel
+    tail = np.broadcast_to(np.arange(used, n), (len(Y), n - used))
+    index = np.concatenate([index, tail], axis=1)
+    return x[index], np.take_along_axis(Y, index, axis=1)
+
+
+class Renderer:
+    """Draw many payoffs in one LineCollection and write them to files.
+    The figure and its style are built once and reused for every chart.
+
+    >>> renderer = Renderer()
+    >>> batch = StrategyBatch.from_strategies(Butterfly.explorator(list(call.values())))
+    >>> renderer.rainbow(g.sT, batch.payoff(g.sT), batch.labels, path='butterfly.png')
+    """
+    def __init__(self, figsize=(12, 10), dpi=100, style_name='dark_background', max_legend=20):
+        self.figsize = figsize
+        self.dpi = dpi
+        self.rc = style.library.get(style_name, {})
+        self.max_legend = max_legend
+        self.figure = None
+        self.ax = None
+
+    def _setup(self, sdeviation=None):
+        if self.figure is None:
+            self.figure = Figure(figsize=self.figsize, dpi=self.dpi)
+            FigureCanvasAgg(self.figure)
+            self.ax = self.figure.add_subplot()
+        ax = self.ax
+        ax.clear()
+        ax.spines['top'].set_visible(False)  # Top border removed
+        ax.spines['right'].set_visible(False)  # Right border removed
+        ax.spines['bottom'].set_position('zero')  # Sets the X-axis in the center
+        if sdeviation:
+            ax.axvspan(sdeviation[0], sdeviation[1], facecolor='#2ca02c', alpha=0.5)
+        ax.set_xlabel('Stock Price')
+        ax.set_ylabel('Profit and loss')
+        return ax
+
+    @instrument.timed('render.headless')
+    def rainbow(self, sT, payoffs, labels=None, path=None, title=None,
+                sdeviation=None, format=None):
+        """Draw the rows of the payoff matrix over sT, in rainbow colors
+
+        :param: payoffs (n_assets, len(sT)) matrix, e.g. StrategyBatch.payoff(sT)
+        :param: labels legend of each row, drawn only up to max_legend rows
+        :param: path file written (format from its extension or format),
+                without path the Figure is returned
+        """
+        sT = np.asarray(sT, dtype=float)
+        payoffs = np.atleast_2d(payoffs)
+        with rc_context(self.rc):
+            ax = self._setup(sdeviation)
+            width = int(self.figsize[0] * self.dpi)
+            x, y = decimate(sT, payoffs, width)
+            instrument.count('points_plotted', x.size)
+            colors = rainbow_color(len(payoffs))
+            lines = LineCollection(np.stack([x, y], axis=-1), colors=colors[:len(payoffs)])
+            ax.add_collection(lines)
+            ax.autoscale_view()
+            if labels is not None and len(labels) <= self.max_legend:
+                handles = [ax.plot([], [], color=color, label='#{:02} {}'.format(i, label))[0]
+                           for i, (label, color) in enumerate(zip(labels, colors))]
+                ax.legend(handles=handles, loc='best')
+            if title:
+                ax.set_title(title)
+            if path is None:
+                return self.figure
+            self.figure.savefig(path, format=format, facecolor=self.figure.get_facecolor())
+        return path
@@ -0,0 +1,301 @@
+import heapq
+from itertools import count
+
+import numpy as np
+
+from analytics import payoff_analytics
+from batch import StrategyBatch
+from chain import CALL, PUT
+from strategy import Strategy
+
+FAMILIES = ('call_spread', 'put_spread', 'butterfly', 'ratio_spread', 'box_spread')
+
+
+def _ratio(scores):
+    """max profit / max loss, inf without loss and 0 for an unbounded loss"""
+    loss = -scores['max_loss']
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = np.where(loss > 0, scores['max_profit'] / loss, np.inf)
+    return np.where(np.isinf(loss), 0.0, ratio)
+
+
+KEYS = {'ratio': _ratio,
+        'max_profit': lambda scores: scores['max_profit'],
+        'max_loss': lambda scores: scores['max_loss'],
+        'cost': lambda scores: -scores['cost'],
+        }
+# clés qui ne décroissent pas quand max_profit ou max_loss augmente : seules
+# celles-ci permettent d'élaguer les candidats dominés
+MONOTONE = ('ratio', 'max_profit', 'max_loss')
+PARETO_BLOCK = 256
+PARETO_RANKED = 64
+
+
+def breakevens(sT, payoff):
+    """Prices where payoff crosses zero, linearly interpolated on the sT grid"""
+    sT = np.asarray(sT, dtype=float)
+    sign = np.sign(payoff)
+    idx = np.flatnonzero(sign[:-1] * sign[1:] < 0)
+    y0 = payoff[idx]
+    y1 = payoff[idx + 1]
+    crossing = sT[idx] + (sT[idx + 1] - sT[idx]) * y0 / (y0 - y1)
+    return [float(x) for x in np.concatenate([crossing, sT[payoff == 0]]).round(2)]
+
+
+def pareto(max_profit, max_loss):
+    """Index of the candidates not dominated on (max_profit, max_loss):
+    no other candidate has both a greater or equal profit and a greater
+    or equal (less negative) loss
+    """
+    order = np.lexsort((-max_loss, -max_profit))
+    best_loss = np.maximum.accumulate(max_loss[order])
+    keep = np.ones(len(order), dtype=bool)
+    keep[1:] = max_loss[order][1:] > best_loss[:-1]
+    return np.sort(order[keep])
+
+
+def pareto_top(max_profit, max_loss, score, k):
+    """Index of the candidates dominated by fewer than k others, another
+    candidate dominating one when it has a greater or equal profit and loss
+    and ranks before it by score (higher, or the same and an earlier index):
+    the k best by score are all kept.
+
+    Only the PARETO_RANKED best candidates are tried as dominating, which
+    keeps the cost linear and may keep a few more.
+    """
+    index = np.arange(len(score))
+    other = np.sort(np.argsort(-score, kind='stable')[:max(k, PARETO_RANKED)])
+    profit, loss, ranked = max_profit[other], max_loss[other], score[other]
+    beaten = np.zeros(len(index), dtype=np.intp)
+    for start in range(0, len(index), PARETO_BLOCK):
+        i = index[start:start + PARETO_BLOCK, None]
+        dominated = (profit >= max_profit[i]) & (loss >= max_loss[i])
+        before = (ranked > score[i]) | ((ranked == score[i]) & (other < i))
+        beaten[start:start + PARETO_BLOCK] = (dominated & before).sum(axis=1)
+    return np.flatnonzero(beaten < k)
+
+
+class Candidate:
+    """A strategy found by the `Scanner` with its scores"""
+    def __init__(self, chain, family, label, cols, quantities,
+                 cost, max_profit, max_loss, breakevens, score):
+        self.chain = chain
+        self.family = family
+        self.label = label
+        self.cols = cols
+        self.quantities = quantities
+        self.cost = cost
+        self.max_profit = max_profit
+        self.max_loss = max_loss
+        self.breakevens = breakevens
+        self.score = score
+
+    def __repr__(self):
+        return '{} score:{:.3f} cost:{}'.format(self.label, self.score, self.cost)
+
+    def strategy(self):
+        strategy = Strategy(self.label)
+        for col, quantity in zip(self.cols, self.quantities):
+            direction = 'long' if quantity > 0 else 'short'
+            strategy.add(self.chain.option(col), direction, abs(quantity))
+        return strategy
+
+
+class Scanner:
+    """Enumerate every strike combination of the strategy families over a
+    chain and score them by batch, exactly from the payoff at the strikes
+    (`analytics.payoff_analytics`) or on the price grid sT when given:
+    - call_spread: long K1 call, short K2 call, K1 < K2
+    - put_spread: long K2 put, short K1 put, K1 < K2
+    - butterfly: long K1, short 2 K2, long K3 calls, any wings K1 < K2 < K3
+    - ratio_spread: long K1 call, short ratio K2 calls, K1 < K2
+    - box_spread: long K1 call, short K2 call, short K3 put, long K4 put,
+      K1 < K2 <= K3 < K4 and K2 - K1 = K4 - K3
+
+    >>> scanner = Scanner(page.scrap_chain())
+    >>> best = scanner.top(10, families=['butterfly'], max_cost=50)
+    """
+    def __init__(self, chain, sT=None, chunk=1024):
+        self.chain = chain
+        self.sT = None if sT is None else np.asarray(sT, dtype=float)
+        self.chunk = chunk
+        strike = chain.strike
+        calls = np.flatnonzero(chain.cat == CALL)
+        puts = np.flatnonzero(chain.cat == PUT)
+        self.calls = calls[np.argsort(strike[calls], kind='stable')]
+        self.puts = puts[np.argsort(strike[puts], kind='stable')]
+
+    def _split(self, cols, quantities):
+        for start in range(0, len(cols), self.chunk):
+            yield cols[start:start + self.chunk], quantities[start:start + self.chunk]
+
+    def _pairs(self, idx):
+        i, j = np.triu_indices(len(idx), 1)
+        return idx[i], idx[j]
+
+    def _call_spread(self):
+        low, high = self._pairs(self.calls)
+        cols = np.stack([low, high], axis=1)
+        yield from self._split(cols, np.tile([1., -1.], (len(cols), 1)))
+
+    def _put_spread(self):
+        low, high = self._pairs(self.puts)
+        cols = np.stack([high, low], axis=1)
+        yield from self._split(cols, np.tile([1., -1.], (len(cols), 1)))
+
+    def _butterfly(self):
+        idx = self.calls
+        quantities = np.array([1., -2., 1.])
+        for j in range(1, len(idx) - 1):
+            low, high = np.meshgrid(idx[:j], idx[j + 1:], indexing='ij')
+            cols = np.stack([low.ravel(), np.full(low.size, idx[j]), high.ravel()], axis=1)
+            yield from self._split(cols, np.tile(quantities, (len(cols), 1)))
+
+    def _ratio_spread(self, ratios=range(1, 6)):
+        low, high = self._pairs(self.calls)
+        cols = np.stack([low, high], axis=1)
+        for ratio in ratios:
+            yield from self._split(cols, np.tile([1., -float(ratio)], (len(cols), 1)))
+
+    def _box_spread(self):
+        strike = self.chain.strike
+        call_low, call_high = self._pairs(self.calls)
+        put_low, put_high = self._pairs(self.puts)
+        call_width = strike[call_high] - strike[call_low]
+        put_width = strike[put_high] - strike[put_low]
+        quantities = np.array([1., -1., -1., 1.])
+        for width in np.intersect1d(call_width, put_width):
+            c = np.flatnonzero(call_width == width)
+            p = np.flatnonzero(put_width == width)
+            ci, pi = np.meshgrid(c, p, indexing='ij')
+            ci, pi = ci.ravel(), pi.ravel()
+            valid = strike[put_low[pi]] >= strike[call_high[ci]]
+            ci, pi = ci[valid], pi[valid]
+            cols = np.stack([call_low[ci], call_high[ci], put_low[pi], put_high[pi]], axis=1)
+            yield from self._split(cols, np.tile(quantities, (len(cols), 1)))
+
+    def _label(self, family, cols, quantities):
+        k = [self.chain.strike[c] for c in cols]
+        if family == 'call_spread':
+            return 'Call Spread {}-{}'.format(k[0], k[1])
+        if family == 'put_spread':
+            return 'Put Spread {}-{}'.format(k[0], k[1])
+        if family == 'butterfly':
+            return 'Butterfly {}-2*{}+{}'.format(k[0], k[1], k[2])
+        if family == 'ratio_spread':
+            return 'Ratio Spread {}-{} R:{}'.format(k[0], k[1], int(-quantities[1]))
+        if family == 'box_spread':
+            return 'Box Spread {}-{}'.format(k[0], k[3])
+        raise Exception('family "{}" is not good'.format(family))
+
+    def _score(self, cols, quantities):
+        """Scores of the chunk and, per candidate, its payoff on sT or its
+        exact breakevens without sT
+        """
+        chain = self.chain
+        if self.sT is None:
+            premium = np.where(quantities > 0, chain.achat[cols], chain.vente[cols])
+            weight = quantities * chain.multiplier[cols]
+            cost = (weight * premium).sum(axis=1)
+            result = payoff_analytics(chain.strike[cols], chain.sign[cols], weight, cost)
+            scores = {'cost': cost,
+                      'max_profit': result['max_profit'],
+                      'max_loss': result['max_loss'],
+                      }
+            return scores, result['breakevens']
+        rows = np.repeat(np.arange(len(cols)), cols.shape[1])
+        batch = StrategyBatch(chain, rows, cols.ravel(), quantities.ravel())
+        payoff = batch.payoff(self.sT)
+        scores = {'cost': batch.cost,
+                  'max_profit': payoff.max(axis=1),
+                  'max_loss': payoff.min(axis=1),
+                  }
+        return scores, payoff
+
+    def _chunks(self, families, key, min_profit, max_loss, max_cost, prune, ratios, k=None):
+        prune = prune and isinstance(key, str) and key in MONOTONE
+        key = KEYS[key] if isinstance(key, str) else key
+        for family in families:
+            if family not in FAMILIES:
+                raise Exception('family "{}" is not good'.format(family))
+            if family == 'ratio_spread':
+                chunks = self._ratio_spread(ratios)
+            else:
+                chunks = getattr(self, '_' + family)()
+            for cols, quantities in chunks:
+                scores, payoff = self._score(cols, quantities)
+                keep = np.ones(len(cols), dtype=bool)
+                if min_profit is not None:
+                    keep &= scores['max_profit'] >= min_profit
+                if max_loss is not None:
+                    keep &= scores['max_loss'] >= -abs(max_loss)
+                if max_cost is not None:
+                    keep &= scores['cost'] <= max_cost
+                keep = np.flatnonzero(keep)
+                scores = {name: value[keep] for name, value in scores.items()}
+                scores['score'] = key(scores)
+                if prune and len(keep):
+                    if k is None:
+                        front = pareto(scores['max_profit'], scores['max_loss'])
+                    else:
+                        front = pareto_top(scores['max_profit'], scores['max_loss'], scores['score'], k)
+                    keep = keep[front]
+                    scores = {name: value[front] for name, value in scores.items()}
+                if not len(keep):
+                    continue
+                yield family, cols[keep], quantities[keep], scores, payoff[keep]
+
+    def _candidate(self, family, cols, quantities, scores, payoff, i):
+        if self.sT is None:
+            found = [float(b) for b in payoff[i][~np.isnan(payoff[i])].round(2)]
+        else:
+            found = breakevens(self.sT, payoff[i])
+        return Candidate(self.chain, family,
+                         self._label(family, cols[i], quantities[i]),
+                         cols[i], quantities[i],
+                         float(scores['cost'][i]),
+                         float(scores['max_profit'][i]),
+                         float(scores['max_loss'][i]),
+                         found,
+                         float(scores['score'][i]))
+
+    def scan(self, families=FAMILIES, key='ratio', min_profit=None, max_loss=None,
+             max_cost=None, prune=True, ratios=range(1, 6)):
+        """Generator of the `Candidate` that pass the filters
+
+        :param: families list of strategy families to enumerate
+        :param: key name in KEYS or function of the score arrays, higher is better
+        :param: min_profit minimum max profit
+        :param: max_loss maximum loss accepted (positive amount)
+        :param: max_cost maximum cost of the strategy
+        :param: prune drop candidates dominated on (max_profit, max_loss) in each
+                chunk, ignored for the keys not in MONOTONE
+        :param: ratios ratios enumerated for ratio_spread
+        """
+        for family, cols, quantities, scores, payoff in self._chunks(
+                families, key, min_profit, max_loss, max_cost, prune, ratios):
+            for i in range(len(cols)):
+                yield self._candidate(family, cols, quantities, scores, payoff, i)
+
+    def top(self, k, families=FAMILIES, key='ratio', min_profit=None, max_loss=None,
+            max_cost=None, prune=True, ratios=range(1, 6)):
+        """The k best candidates of `scan` by score, keeping only a heap of size k.
+        prune only drops the candidates dominated by k others, the result is
+        the same as with prune=False.
+        """
+        heap = []
+        tie = count()
+        for family, cols, quantities, scores, payoff in self._chunks(
+                families, key, min_profit, max_loss, max_cost, prune, ratios, k):
+            score = scores['score']
+            candidates = np.arange(len(score))
+            if len(heap) == k:
+                candidates = candidates[score > heap[0][0]]
+            for i in candidates[np.argsort(-score[candidates], kind='stable')][:k]:
+                item = (score[i], -next(tie),
+                        self._candidate(family, cols, quantities, scores, payoff, i))
+                if len(heap) < k:
+                    heapq.heappush(heap, item)
+                elif item[0] > heap[0][0]:
+                    heapq.heapreplace(heap, item)
+        return [item[2] for item in sorted(heap, key=lambda item: (-item[0], -item[1]))]
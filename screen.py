@@ -0,0 +1,271 @@
+"""Screening of the chains of several tickers and expiries, from a script
+or from the command line:
+
+    python screen.py -t CACPXA -e 2018-03 -f butterfly --max-cost 50 -o best.csv
+    python screen.py --from-snapshot snapshots --top 20 -o best.parquet
+    python screen.py --format json --workers 4 > best.json
+"""
+import argparse
+import csv
+import json
+import math
+import sys
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+from euronext import Page, Ticker
+from scanner import FAMILIES, KEYS, Scanner
+from store import NEAREST, SnapshotStore
+
+COLUMNS = ('ticker', 'expiry', 'rank', 'family', 'label', 'score', 'cost',
+           'max_profit', 'max_loss', 'breakevens', 'legs')
+FORMATS = ('csv', 'json', 'jsonl', 'parquet')
+
+
+def screen_chain(chain, top=10, **kwargs):
+    """Best candidates of a chain as plain dicts (picklable, ready to export)"""
+    scanner = Scanner(chain)
+    return [{'family': c.family,
+             'label': c.label,
+             'score': c.score,
+             'cost': c.cost,
+             'max_profit': c.max_profit,
+             'max_loss': c.max_loss,
+             'breakevens': c.breakevens,
+             'legs': [(chain.option(col).label, float(q))
+                      for col, q in zip(c.cols, c.quantities)],
+             } for c in scanner.top(top, **kwargs)]
+
+
+def _chain(ticker, expiry, multiplier, root, timeout):
+    """Chain of (ticker, expiry) fetched, or read from the store at root"""
+    if root is None:
+        page = Page(ticker=ticker, expiry=expiry)
+        page.fetch(timeout=timeout)
+        return page.scrap_chain(multiplier)
+    store = SnapshotStore(root)
+    if not store.snapshots(ticker, NEAREST if expiry is None else expiry):
+        raise Exception('no snapshot')
+    return store.read(ticker, expiry)
+
+
+def _screen_page(job):
+    ticker, expiry, multiplier, top, kwargs, root, timeout = job
+    try:
+        chain = _chain(ticker, expiry, multiplier, root, timeout)
+    except Exception as error:
+        # une page ou un snapshot en échec ne doit pas arrêter les autres
+        warnings.warn('{} {} skipped: {}'.format(ticker.name, expiry or NEAREST, error))
+        return []
+    results = screen_chain(chain, top=top, **kwargs)
+    for rank, result in enumerate(results):
+        result.update(ticker=ticker.name, expiry=expiry, rank=rank)
+    return results
+
+
+def iscreen(tickers=tuple(Ticker), expiries=(None,), families=FAMILIES,
+            top=10, multiplier=1, workers=None, store=None, timeout=30, **kwargs):
+    """Same as `screen` but a generator of the results of each (ticker, expiry),
+    yielded as soon as they and the ones before them are done
+    """
+    kwargs['families'] = families
+    jobs = [(ticker, expiry, multiplier, top, kwargs, store, timeout)
+            for ticker in tickers
+            for expiry in (expiries[ticker] if isinstance(expiries, dict) else expiries)]
+    if workers == 1:
+        yield from map(_screen_page, jobs)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(_screen_page, jobs)
+
+
+def screen(tickers=tuple(Ticker), expiries=(None,), families=FAMILIES,
+           top=10, multiplier=1, workers=None, store=None, timeout=30, **kwargs):
+    """Scrap and screen every (ticker, expiry) in a process pool
+
+    :param: tickers list of euronext.Ticker
+    :param: expiries list of expiry ('md' parameter of the page), None for the nearest,
+            or dict ticker -> list of expiry
+    :param: families strategy families of the Scanner
+    :param: top number of candidates kept per (ticker, expiry)
+    :param: workers number of processes, None for the number of CPU, 1 to stay in process
+    :param: store root of a `store.SnapshotStore` to screen the last snapshot
+            of each (ticker, expiry) instead of scraping the pages
+    :param: timeout seconds to wait for a page
+    :param: kwargs other filters of `Scanner.top` (key, max_cost, ...)
+
+    Results are merged in the order of tickers then expiries then rank,
+    whatever the order in which the workers finish. A (ticker, expiry) whose
+    page fails or which has no snapshot is skipped with a warning.
+
+    >>> screen([Ticker.CACPXA, Ticker.CAC1PX], families=['butterfly'], max_cost=50)
+    """
+    return [r for results in iscreen(tickers, expiries, families, top, multiplier,
+                                     workers, store, timeout, **kwargs)
+            for r in results]
+
+
+def _flat(result):
+    """Row of a result with breakevens and legs as text, for csv"""
+    row = dict(result)
+    row['breakevens'] = ' '.join(str(b) for b in result['breakevens'])
+    row['legs'] = ' '.join('{:+g}*{}'.format(q, label) for label, q in result['legs'])
+    return row
+
+
+def _json(result):
+    """JSON line of a result, None for the infinite or NaN values"""
+    def finite(value):
+        return value if not isinstance(value, float) or math.isfinite(value) else None
+    row = {c: finite(result[c]) for c in COLUMNS}
+    row['breakevens'] = [finite(b) for b in result['breakevens']]
+    return json.dumps(row)
+
+
+class _CsvWriter:
+    def __init__(self, output):
+        self.output = output
+        self.writer = csv.DictWriter(output, fieldnames=COLUMNS)
+        self.writer.writeheader()
+
+    def write(self, results):
+        self.writer.writerows(_flat(r) for r in results)
+        self.output.flush()
+
+    def close(self):
+        pass
+
+
+class _JsonWriter:
+    """One JSON array, written row by row"""
+    def __init__(self, output):
+        self.output = output
+        self.first = True
+        output.write('[')
+
+    def write(self, results):
+        for result in results:
+            self.output.write('\n' if self.first else ',\n')
+            self.output.write(_json(result))
+            self.first = False
+        self.output.flush()
+
+    def close(self):
+        self.output.write('\n]\n')
+
+
+class _JsonLinesWriter:
+    def __init__(self, output):
+        self.output = output
+
+    def write(self, results):
+        for result in results:
+            self.output.write(_json(result) + '\n')
+        self.output.flush()
+
+    def close(self):
+        pass
+
+
+class _ParquetWriter:
+    """One row group per (ticker, expiry), pyarrow is needed"""
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise Exception('format "parquet" needs pyarrow, pip install pyarrow')
+        self.pa = pa
+        self.schema = pa.schema([('ticker', pa.string()), ('expiry', pa.string()),
+                                 ('rank', pa.int32()), ('family', pa.string()),
+                                 ('label', pa.string()), ('score', pa.float64()),
+                                 ('cost', pa.float64()), ('max_profit', pa.float64()),
+                                 ('max_loss', pa.float64()),
+                                 ('breakevens', pa.list_(pa.float64())), ('legs', pa.string())])
+        self.writer = pq.ParquetWriter(path, self.schema)
+
+    def write(self, results):
+        if results:
+            rows = [dict(r, legs=_flat(r)['legs']) for r in results]
+            self.writer.write_table(self.pa.Table.from_pylist(rows, schema=self.schema))
+
+    def close(self):
+        self.writer.close()
+
+
+WRITERS = {'csv': _CsvWriter, 'json': _JsonWriter, 'jsonl': _JsonLinesWriter}
+
+
+def _write(writer, batches):
+    try:
+        for results in batches:
+            writer.write(results)
+    finally:
+        writer.close()
+
+
+def _format(args):
+    if args.format:
+        return args.format
+    if args.output:
+        extension = args.output.rsplit('.', 1)[-1]
+        if extension in FORMATS:
+            return extension
+    return 'csv'
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Screen the option chains of Euronext')
+    parser.add_argument('-t', '--ticker', dest='tickers', action='append', choices=[t.name for t in Ticker],
+                        help='ticker to screen, repeat for several (default all)')
+    parser.add_argument('-e', '--expiry', dest='expiries', action='append',
+                        help="expiry to screen ('md' of the page), repeat for several (default the nearest,"
+                             " or every stored expiry with --from-snapshot)")
+    parser.add_argument('-f', '--family', dest='families', action='append', choices=FAMILIES,
+                        help='strategy family, repeat for several (default all)')
+    parser.add_argument('--key', default='ratio', choices=sorted(KEYS), help='ranking of the candidates')
+    parser.add_argument('--top', type=int, default=10, help='candidates kept per ticker and expiry')
+    parser.add_argument('--min-profit', type=float, help='minimum max profit')
+    parser.add_argument('--max-loss', type=float, help='maximum loss accepted (positive amount)')
+    parser.add_argument('--max-cost', type=float, help='maximum cost of the strategy')
+    parser.add_argument('--ratios', type=int, nargs='+', default=list(range(1, 6)),
+                        help='ratios of the ratio spreads')
+    parser.add_argument('--no-prune', dest='prune', action='store_false',
+                        help='keep the candidates dominated on max profit and max loss')
+    parser.add_argument('--multiplier', type=float, default=1, help='contract multiplier')
+    parser.add_argument('--workers', type=int, help='number of processes (default the number of CPU)')
+    parser.add_argument('--timeout', type=float, default=30, help='seconds to wait for a page')
+    parser.add_argument('--from-snapshot', dest='store', metavar='DIR',
+                        help='screen the last snapshots of a SnapshotStore instead of fetching')
+    parser.add_argument('--format', choices=FORMATS, help='output format (default from the extension, else csv)')
+    parser.add_argument('-o', '--output', help='output file (default stdout)')
+    args = parser.parse_args(argv)
+
+    tickers = [Ticker[name] for name in args.tickers] if args.tickers else list(Ticker)
+    expiries = args.expiries or [None]
+    if args.store and not args.expiries:
+        # chaque ticker avec ses propres échéances stockées, sous leur nom de répertoire
+        store = SnapshotStore(args.store)
+        tickers = [t for t in tickers if t.name in store.tickers()]
+        expiries = {t: store.expiries(t) for t in tickers}
+    fmt = _format(args)
+    if fmt == 'parquet' and not args.output:
+        raise Exception('format "parquet" needs an --output file')
+
+    results = iscreen(tickers, expiries, families=args.families or FAMILIES,
+                      top=args.top, multiplier=args.multiplier, workers=args.workers,
+                      store=args.store, timeout=args.timeout, key=args.key, min_profit=args.min_profit,
+                      max_loss=args.max_loss, max_cost=args.max_cost, prune=args.prune,
+                      ratios=args.ratios)
+    if fmt == 'parquet':
+        _write(_ParquetWriter(args.output), results)
+    elif args.output:
+        with open(args.output, 'w', newline='') as output:
+            _write(WRITERS[fmt](output), results)
+    else:
+        _write(WRITERS[fmt](sys.stdout), results)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
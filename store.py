@@ -0,0 +1,108 @@
+import os
+import shutil
+from datetime import datetime
+
+import numpy as np
+
+from chain import OptionChain
+
+COLUMNS = ('strike', 'achat', 'vente', 'cat', 'multiplier', 'volume', 'open_interest')
+TIME_FORMAT = '%Y%m%dT%H%M%S'
+NEAREST = 'nearest'
+
+
+def _name(ticker):
+    """Directory name of a ticker, euronext.Ticker or str"""
+    return getattr(ticker, 'name', ticker)
+
+
+def _expiry(expiry):
+    return NEAREST if expiry is None else str(expiry).replace('/', '-')
+
+
+class SnapshotStore:
+    """Store of scraped chains on disk, one directory per snapshot and one
+    `.npy` file per column of the chain:
+
+        root/<ticker>/<expiry>/<YYYYMMDDTHHMMSS>/strike.npy, achat.npy, ...
+
+    Columns are read back memory-mapped, so the data is only paged in
+    when used.
+
+    >>> store = SnapshotStore('snapshots')
+    >>> store.write(page.scrap_chain(), Ticker.CACPXA, '2018-03')
+    >>> for key, chain in store.iter(Ticker.CACPXA, start=datetime(2018, 1, 1)):
+    ...     pass
+    """
+    def __init__(self, root):
+        self.root = root
+
+    def _path(self, ticker, expiry, timestamp=None):
+        path = os.path.join(self.root, _name(ticker), _expiry(expiry))
+        if timestamp is None:
+            return path
+        return os.path.join(path, timestamp.strftime(TIME_FORMAT))
+
+    def write(self, chain, ticker, expiry=None, timestamp=None):
+        """Write chain as the snapshot of ticker/expiry at timestamp (now by default)"""
+        timestamp = timestamp or datetime.now()
+        path = self._path(ticker, expiry, timestamp)
+        tmp = path + '.tmp'
+        os.makedirs(tmp, exist_ok=True)
+        for column in COLUMNS:
+            np.save(os.path.join(tmp, column + '.npy'), getattr(chain, column))
+        if os.path.exists(path):
+            shutil.rmtree(path)
+        os.rename(tmp, path)
+        return path
+
+    def read(self, ticker, expiry=None, timestamp=None, mmap_mode='r'):
+        """Chain of the snapshot of ticker/expiry at timestamp, the last one by
+        default, expiry None being the nearest (not every expiry as in `snapshots`)
+        """
+        if timestamp is None:
+            # le répertoire de l'échéance seule : expiry None est la plus proche, pas toutes
+            stamps = self._listdir(self._path(ticker, expiry))
+            if not stamps:
+                raise Exception('no snapshot for {} {}'.format(_name(ticker), _expiry(expiry)))
+            timestamp = datetime.strptime(stamps[-1], TIME_FORMAT)
+        path = self._path(ticker, expiry, timestamp)
+        columns = {column: np.load(os.path.join(path, column + '.npy'), mmap_mode=mmap_mode)
+                   for column in COLUMNS}
+        return OptionChain(**columns)
+
+    def _listdir(self, path):
+        if not os.path.isdir(path):
+            return []
+        return sorted(name for name in os.listdir(path) if not name.endswith('.tmp'))
+
+    def tickers(self):
+        return self._listdir(self.root)
+
+    def expiries(self, ticker):
+        return self._listdir(os.path.join(self.root, _name(ticker)))
+
+    def snapshots(self, ticker=None, expiry=None, start=None, end=None):
+        """Sorted list of (ticker, expiry, timestamp) of the snapshots stored,
+        filtered on ticker, expiry and start <= timestamp < end
+        """
+        keys = []
+        tickers = [_name(ticker)] if ticker is not None else self.tickers()
+        for name in tickers:
+            expiries = [_expiry(expiry)] if expiry is not None else self.expiries(name)
+            for exp in expiries:
+                for stamp in self._listdir(os.path.join(self.root, name, exp)):
+                    timestamp = datetime.strptime(stamp, TIME_FORMAT)
+                    if start is not None and timestamp < start:
+                        continue
+                    if end is not None and timestamp >= end:
+                        continue
+                    keys.append((name, None if exp == NEAREST else exp, timestamp))
+        return sorted(keys, key=lambda key: (key[2], key[0], key[1] or ''))
+
+    def iter(self, ticker=None, expiry=None, start=None, end=None):
+        """Generator of ((ticker, expiry, timestamp), chain) in time order,
+        each chain being read only when reached
+        """
+        for key in self.snapshots(ticker, expiry, start, end):
+            yield key, self.read(*key)
@@ -1,27 +1,53 @@
 import numpy as np
+from array import array
 from math import ceil, floor
 
+import instrument
+import kernels
+from analytics import payoff_analytics
+from chain import StrikeIndex
+from product import Direction
+
 
 class Strategy:
+    """Legs are kept as parallel sequences instead of one dict per leg:
+    the options, the sign of the direction (`product.Direction`) in a
+    typed array and the quantities in another one
+    """
+    __slots__ = ('label', '_options', '_signs', '_quantities')
+
     def __init__(self, label=''):
         self.label = label
-        self.options = []
+        self._options = []
+        self._signs = array('b')
+        self._quantities = array('d')
 
     def add(self, option, direction, quantity):
-        self.options.append({'option': option,
-                             'direction': direction,
-                             'quantity': quantity})
+        self._options.append(option)
+        self._signs.append(Direction.of(direction))
+        self._quantities.append(quantity)
         return self
 
+    def legs(self):
+        """Iterate over the legs as (option, sign, quantity), sign being +1 for long"""
+        return zip(self._options, self._signs, self._quantities)
+
+    @property
+    def options(self):
+        """Legs as a list of {'option', 'direction', 'quantity'}"""
+        return [{'option': option,
+                 'direction': str(Direction(sign)),
+                 'quantity': int(quantity) if quantity.is_integer() else quantity,
+                 } for option, sign, quantity in self.legs()]
+
+    @instrument.timed('evaluate.strategy')
     def payoff(self, sT, direction='long'):
-        payoff_sum = 0
-        for o in self.options:
-            option = o['option']
-            direct = o['direction']
-            quantity = o['quantity']
-            payoff = option.payoff(sT, direct) * quantity
-            payoff_sum += payoff
-        return payoff_sum
+        instrument.count('strategies_evaluated')
+        options = self._options
+        strike = [o.strike for o in options]
+        sign = [1 if o.cat == 'Call' else -1 for o in options]
+        weight = [s * q * o.multiplier for o, s, q in self.legs()]
+        return kernels.payoff(sT, strike, sign, weight, self.cost())
 
     def __str__(self):
         return self.label if self.label else 'Strategy'
@@ -39,7 +65,36 @@ class Strategy:
                  } for o in self.options]
 
     def cost(self):
-        return sum(e['option'].cost(e['direction']) * e['quantity'] for e in self.options)
+        return sum(option.multiplier * quantity *
+                   (option.achat if sign > 0 else -option.vente)
+                   for option, sign, quantity in self.legs())
+
+    def analytics(self):
+        """Exact max profit, max loss and breakevens of the payoff at expiry,
+        computed at its kinks (the strikes) instead of on a price grid
+        """
+        strike = np.array([[o.strike for o in self._options]], dtype=float)
+        sign = np.array([[1 if o.cat == 'Call' else -1 for o in self._options]])
+        weight = np.array([[sign * quantity * option.multiplier
+                            for option, sign, quantity in self.legs()]])
+        result = payoff_analytics(strike, sign, weight, [self.cost()])
+        breakevens = result['breakevens'][0]
+        return {'max_profit': float(result['max_profit'][0]),
+                'max_loss': float(result['max_loss'][0]),
+                'breakevens': [float(b) for b in breakevens[~np.isnan(breakevens)]],
+                }
+
+    def max_profit(self):
+        """Max profit at expiry, inf when unbounded"""
+        return self.analytics()['max_profit']
+
+    def max_loss(self):
+        """Min of the payoff at expiry, -inf when the loss is unbounded"""
+        return self.analytics()['max_loss']
+
+    def breakevens(self):
+        """Prices at expiry where the payoff is 0"""
+        return self.analytics()['breakevens']
 
     def short(self, label=None):
         """Create a new strategy is shorted this one
@@ -47,9 +102,8 @@ class Strategy:
         if not label:
             label = 'Short {}'.format(self.label)
         strategy_short = Strategy(label=label)
-        for o in self.options:
-            direction = 'short' if o['direction'] == 'long' else 'long'
-            strategy_short.add(o['option'], direction, o['quantity'])
+        for option, sign, quantity in self.legs():
+            strategy_short.add(option, Direction(-sign), quantity)
         return strategy_short
 
 class RatioSpread(Strategy):
@@ -61,6 +115,8 @@ class RatioSpread(Strategy):
     .        \      .
     .................
     """
+    __slots__ = ()
+
     def __init__(self, call_long, call_short, ratio=None):
         plong = call_long.achat
         pshort = call_short.vente
@@ -71,22 +127,17 @@ class RatioSpread(Strategy):
         self.add(call_short, 'short', ratio)
 
     @staticmethod
+    @instrument.timed('explore.RatioSpread')
     def explorator(list_callput, step=50):
         """
         :param: list_callput list of put or list of call
         :param: step between each option to consider
         """
-        strikes = [o.strike for o in list_callput]
-        by_strike = dict(zip(strikes, list_callput))
-        css = []
-        for i, strike_a in enumerate(strikes[:-1]):
-            strike_b = strike_a + step
-            if (strike_b not in strikes):
-                continue
-            a = by_strike[strike_a]
-            b = by_strike[strike_b]
-            css.append(RatioSpread(a, b))
-        return css
+        list_callput = list(list_callput)
+        strikes = np.array([o.strike for o in list_callput], dtype=float)
+        found = StrikeIndex(strikes).find(strikes + step)
+        return [RatioSpread(list_callput[a], list_callput[found[a]])
+                for a in np.flatnonzero(found >= 0)]
 
 class CallSpread(Strategy):
     """A Call Spread is buy and sell call of different strike:
@@ -99,6 +150,8 @@ class CallSpread(Strategy):
        .____/          .
        .................
     """
+    __slots__ = ()
+
     def __init__(self, call_long, call_short):
         """ Create a Call spread
         call_long.strike < call_short.strike
@@ -112,18 +165,13 @@ class CallSpread(Strategy):
         self.add(call_short, 'short', 1)
 
     @staticmethod
+    @instrument.timed('explore.CallSpread')
     def explorator(list_put, step=50):
-        strikes = [o.strike for o in list_put]
-        by_strike = dict(zip(strikes, list_put))
-        css = []
-        for i, strike_a in enumerate(strikes[:-1]):
-            strike_b = strike_a + step
-            if (strike_b not in strikes):
-                continue
-            a = by_strike[strike_a]
-            b = by_strike[strike_b]
-            css.append(CallSpread(a, b))
-        return css
+        list_put = list(list_put)
+        strikes = np.array([o.strike for o in list_put], dtype=float)
+        found = StrikeIndex(strikes).find(strikes + step)
+        return [CallSpread(list_put[a], list_put[found[a]])
+                for a in np.flatnonzero(found >= 0)]
 
 
 class PutSpread(Strategy):
@@ -140,6 +188,8 @@ class PutSpread(Strategy):
 
        >>> ps = PutSpread(put[100], put[80])
     """
+    __slots__ = ()
+
     def __init__(self, put_long, put_short):
         plong = put_long.achat
         pshort = put_short.vente
@@ -150,18 +200,13 @@ class PutSpread(Strategy):
         self.add(put_short, 'short', 1)
 
     @staticmethod
+    @instrument.timed('explore.PutSpread')
     def explorator(list_put, step=50):
-        strikes = [o.strike for o in list_put]
-        by_strike = dict(zip(strikes, list_put))
-        pss = []
-        for i, strike_a in enumerate(strikes[:-1]):
-            strike_b = strike_a + step
-            if (strike_b not in strikes):
-                continue
-            a = by_strike[strike_a]
-            b = by_strike[strike_b]
-            pss.append(PutSpread(b, a))
-        return pss
+        list_put = list(list_put)
+        strikes = np.array([o.strike for o in list_put], dtype=float)
+        found = StrikeIndex(strikes).find(strikes + step)
+        return [PutSpread(list_put[found[a]], list_put[a])
+                for a in np.flatnonzero(found >= 0)]
 
 
 class BoxSpread(Strategy):
@@ -176,6 +221,8 @@ class BoxSpread(Strategy):
        . ___/         \___ .
        .....................
     """
+    __slots__ = ()
+
     def __init__(self, call_long, call_short, put_long, put_short):
         plong = call_long.achat
         pshort = call_short.vente
@@ -188,36 +235,22 @@ class BoxSpread(Strategy):
         self.add(put_short, 'long', 1)
 
     @staticmethod
+    @instrument.timed('explore.BoxSpread')
     def explorator(list_call, list_put, spread=50, gap=100, step=25):
         """
         :param: spread diff between strike of 2 call or 2 put
         :param: gap diff between put and call
         :param: step diff between 2 BoxSpread
         """
-        strikes_call = [o.strike for o in list_call]
-        strikes_put = [o.strike for o in list_put]
-        strikes = [v for v in strikes_call if v in strikes_put]
-        strikes = strikes_call + strikes_put
-        call_by_strike = dict(zip(strikes, list_call))
-        put_by_strike = dict(zip(strikes, list_call))
-
-        bfs = []
-        for i, strike_a in enumerate(strikes[:-3]):
-            strike_b = strike_a + step
-            strike_c = strike_b + gap
-            strike_d = strike_c + step
-            if (strike_a not in call_by_strike or
-                strike_b not in call_by_strike or
-                strike_c not in put_by_strike or
-                strike_d not in put_by_strike
-                ):
-                continue
-            a = call_by_strike[strike_a]
-            b = call_by_strike[strike_b]
-            c = put_by_strike[strike_c]
-            d = put_by_strike[strike_d]
-            bfs.append(BoxSpread(b, a, c, d))
-        return bfs
+        list_call, list_put = list(list_call), list(list_put)
+        strikes = np.array([o.strike for o in list_call], dtype=float)
+        calls = StrikeIndex(strikes)
+        puts = StrikeIndex([o.strike for o in list_put])
+        b = calls.find(strikes + step)
+        c = puts.find(strikes + step + gap)
+        d = puts.find(strikes + 2 * step + gap)
+        return [BoxSpread(list_call[b[a]], list_call[a], list_put[c[a]], list_put[d[a]])
+                for a in np.flatnonzero((b >= 0) & (c >= 0) & (d >= 0))]
 
 
 class Butterfly(Strategy):
@@ -232,6 +265,8 @@ class Butterfly(Strategy):
        .___/      \___ .
        .................
     """
+    __slots__ = ()
+
     def __init__(self, call_low, call_middle, call_high, label=None):
         label = 'Butterfly {}-2*{}+{}'.format(call_low.strike,
                                               call_middle.strike,
@@ -242,22 +277,15 @@ class Butterfly(Strategy):
         self.add(call_high, 'long', 1)
 
     @staticmethod
+    @instrument.timed('explore.Butterfly')
     def explorator(list_call, step=50):
-        strikes = [o.strike for o in list_call]
-        by_strike = dict(zip(strikes, list_call))
-        bfs = []
-        for i, strike_a in enumerate(strikes[:-2]):
-            strike_b = strike_a + step
-            strike_c = strike_b + step
-            if (strike_b not in strikes or
-                strike_c not in strikes
-                ):
-                continue
-            a = by_strike[strike_a]
-            b = by_strike[strike_b]
-            c = by_strike[strike_c]
-            bfs.append(Butterfly(a, b, c))
-        return bfs
+        list_call = list(list_call)
+        strikes = np.array([o.strike for o in list_call], dtype=float)
+        index = StrikeIndex(strikes)
+        b = index.find(strikes + step)
+        c = index.find(strikes + 2 * step)
+        return [Butterfly(list_call[a], list_call[b[a]], list_call[c[a]])
+                for a in np.flatnonzero((b >= 0) & (c >= 0))]
 
 
 def IronCondor(put_k1, put_k2, call_k3, call_k4):
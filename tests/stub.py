@@ -0,0 +1,79 @@
+"""Local HTTP server standing in for Euronext: every page is the fixture
+saved html, after the error statuses queued for its ticker
+
+    python -m tests.stub 8080           # serve tests/fixtures/page.html
+
+>>> async with StubServer(statuses={'PXA-DPAR': [503, 503]}) as server:
+...     chains = await fetch_pages([server.page(Ticker.CACPXA)])
+>>> server.hits['PXA-DPAR']
+3
+"""
+import asyncio
+import os
+import sys
+from collections import Counter
+
+from aiohttp import web
+
+from euronext import Page
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'page.html')
+
+
+class StubServer:
+    """aiohttp server of the fixture page on 127.0.0.1
+
+    :param: statuses dict ticker value -> list of status answered before the page
+    :param: path html file served
+    """
+    def __init__(self, statuses=None, path=FIXTURE, port=0):
+        self.statuses = {ticker: list(codes) for ticker, codes in (statuses or {}).items()}
+        self.port = port
+        self.hits = Counter()
+        with open(path, 'rb') as page:
+            self.content = page.read()
+        self.app = web.Application()
+        self.app.router.add_get('/{ticker}', self._handle)
+        self.runner = None
+
+    async def _handle(self, request):
+        ticker = request.match_info['ticker']
+        self.hits[ticker] += 1
+        if self.statuses.get(ticker):
+            return web.Response(status=self.statuses[ticker].pop(0))
+        return web.Response(body=self.content, content_type='text/html')
+
+    @property
+    def site(self):
+        return 'http://127.0.0.1:{}'.format(self.port)
+
+    def page(self, ticker, expiry=None):
+        """`euronext.Page` of ticker pointing at this server"""
+        return Page(site=self.site, ticker=ticker, expiry=expiry)
+
+    async def start(self):
+        self.runner = web.AppRunner(self.app)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, '127.0.0.1', self.port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc):
+        await self.stop()
+
+
+async def _serve(port):
+    async with StubServer(port=port) as server:
+        print('serving {} on {}'.format(FIXTURE, server.site))
+        await asyncio.Event().wait()
+
+
+if __name__ == '__main__':
+    asyncio.run(_serve(int(sys.argv[1]) if len(sys.argv) > 1 else 8080))
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+
+from analytics import kink_payoff
+
+
+@pytest.mark.parametrize('legs', [1, 3, 8, 40])
+def test_kink_payoff_matches_legs(legs):
+    rng = np.random.default_rng(legs)
+    strike = rng.choice([0, 4800, 4900, 5000, 5100], (200, legs)).astype(float)
+    sign = rng.choice([-1.0, 1.0], (200, legs))
+    weight = rng.choice([-20, -10, 0, 10, 30], (200, legs)).astype(float)
+    cost = rng.normal(0, 50, 200)
+    points, payoff = kink_payoff(strike, sign, weight, cost)
+    value = np.maximum(sign[:, None, :] * (points[:, :, None] - strike[:, None, :]), 0)
+    assert np.allclose(payoff, (value * weight[:, None, :]).sum(axis=2) - cost[:, None])
+    assert np.array_equal(points[:, 1:], np.sort(strike, axis=1))
@@ -0,0 +1,16 @@
+from datetime import datetime
+
+from backtest import Backtest, scanner_rule
+from benchmarks import synthetic
+from store import SnapshotStore
+
+
+def test_nearest_snapshots_skipped(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.write(synthetic.chain(10), 'CACPXA', None, datetime(2018, 3, 1))
+    store.write(synthetic.chain(10), 'CACPXA', '2018-03', datetime(2018, 3, 1))
+    store.write(synthetic.chain(10, seed=1), 'CACPXA', '2018-03', datetime(2018, 3, 16))
+    report = Backtest(store, scanner_rule(families=['call_spread'])).run()
+    assert report['fills']['snapshots'] == 2
+    assert report['fills']['undated'] == 1
+    assert [entry['expiry'] for entry in report['pnl']] == ['2018-03']
@@ -0,0 +1,28 @@
+import pytest
+
+from benchmarks import synthetic
+from euronext import Page
+
+TITLE = b'<h1 class="title">CAC 40 Index options</h1>'
+
+
+@pytest.mark.parametrize('heading', [
+    b'<h1 class="title">CAC 40 Index options</h1>',
+    b'<h1 class="title big">CAC 40 Index options</h1>',
+    b'<h1 id="top" class="main  title">CAC 40 <b>Index</b> options</h1>',
+    b"<h1 class='title'>CAC 40 Index options</h1>",
+    b'<h1 class="subtitle">Other</h1><h1 class="title-big">Other</h1><h1 class="title">CAC</h1>',
+])
+def test_title_same_as_bs4(heading):
+    html = synthetic.page_html(5, filler=0).replace(TITLE, heading)
+    fast, soup = Page(), Page()
+    fast.load(html, parser='fast')
+    soup.load(html)
+    assert fast.page_title == soup.page_title
+
+
+def test_no_title():
+    html = synthetic.page_html(5, filler=0).replace(TITLE, b'<h1 class="subtitle">Other</h1>')
+    page = Page()
+    page.load(html, parser='fast')
+    assert page.page_title is None
@@ -0,0 +1,27 @@
+import asyncio
+
+from benchmarks import synthetic
+from euronext import Ticker
+from feed import Feed
+
+
+def test_dropped_keys_delivered():
+    async def run():
+        chains = {}
+
+        async def fetch(pages):
+            return [chains.get(page.ticker, synthetic.chain(10)) for page in pages]
+
+        feed = Feed([Ticker.CACPXA, Ticker.CAC1PX, Ticker.CAC2PX], fetch=fetch)
+        subscription = feed.subscribe(maxsize=2)
+        await feed.poll()
+        assert subscription.dropped == 1
+        received = []
+        for _ in range(3):
+            received.append((await asyncio.wait_for(subscription.__anext__(), 1))['ticker'])
+        chains[Ticker.CAC2PX.value] = synthetic.chain(10, seed=1)
+        await feed.poll()
+        received.append((await asyncio.wait_for(subscription.__anext__(), 1))['ticker'])
+        return received
+
+    assert asyncio.run(run()) == ['CACPXA', 'CAC1PX', 'CAC2PX', 'CAC2PX']
@@ -0,0 +1,64 @@
+import asyncio
+
+import aiohttp
+import numpy as np
+import pytest
+
+from euronext import Page, Ticker
+from fetcher import fetch_pages
+from tests.stub import FIXTURE, StubServer
+
+
+@pytest.fixture(scope='module')
+def expected():
+    page = Page()
+    with open(FIXTURE, 'rb') as html:
+        page.load(html.read())
+    return page.scrap_chain()
+
+
+def fetch(statuses, parser='bs4', retries=3):
+    async def run():
+        async with StubServer(statuses) as server:
+            pages = [server.page(Ticker.CACPXA), server.page(Ticker.CAC1PX)]
+            chains = await fetch_pages(pages, retries=retries, backoff=0.01,
+                                       parser=parser, return_exceptions=True)
+            return chains, server.hits
+    return asyncio.run(run())
+
+
+@pytest.mark.parametrize('parser', ['bs4', 'fast'])
+def test_fetch_fixture(parser, expected):
+    chains, hits = fetch({}, parser)
+    for chain in chains:
+        assert np.array_equal(chain.strike, expected.strike)
+        assert np.array_equal(chain.achat, expected.achat, equal_nan=True)
+    assert hits == {'PXA-DPAR': 1, '1PX-DPAR': 1}
+
+
+def test_retry_status(expected):
+    chains, hits = fetch({'PXA-DPAR': [503, 429]})
+    assert len(chains[0]) == len(expected)
+    assert hits['PXA-DPAR'] == 3
+
+
+def test_retries_exhausted(expected):
+    chains, hits = fetch({'PXA-DPAR': [503] * 5}, retries=2)
+    assert isinstance(chains[0], aiohttp.ClientResponseError)
+    assert chains[0].status == 503
+    assert hits['PXA-DPAR'] == 3
+    assert len(chains[1]) == len(expected)
+
+
+@pytest.mark.parametrize('status', [403, 404])
+def test_no_retry_client_error(status):
+    chains, hits = fetch({'PXA-DPAR': [status]})
+    assert isinstance(chains[0], aiohttp.ClientResponseError)
+    assert chains[0].status == status
+    assert hits['PXA-DPAR'] == 1
+
+
+def test_fixture_is_synthetic_page():
+    from benchmarks import synthetic
+    with open(FIXTURE, 'rb') as page:
+        assert page.read() == synthetic.page_html(20, filler=20)
@@ -0,0 +1,21 @@
+import numpy as np
+
+from benchmarks import synthetic
+from chain import OptionChain
+from incremental import Tracker
+from scanner import Scanner
+
+
+def test_update_reordered_chain():
+    chain = synthetic.chain(20)
+    candidates = Scanner(chain).top(50, families=['butterfly'])
+    shifted = OptionChain(chain.strike, chain.achat + 1, chain.vente + 1, chain.cat, chain.multiplier)
+    order = np.arange(len(chain))[::-1]
+    reordered = OptionChain(shifted.strike[order], shifted.achat[order], shifted.vente[order],
+                            shifted.cat[order], shifted.multiplier[order])
+    tracker = Tracker.from_candidates(candidates, chain)
+    tracker.update(reordered)
+    expected = Tracker.from_candidates(candidates, chain)
+    expected.update(shifted)
+    assert np.allclose(tracker.scores['cost'], expected.scores['cost'])
+    assert np.array_equal(tracker.ranking, expected.ranking)
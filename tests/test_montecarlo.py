@@ -0,0 +1,23 @@
+import pytest
+
+from benchmarks import synthetic
+from montecarlo import simulate
+from strategy import Butterfly
+
+
+@pytest.fixture(scope='module')
+def strategies():
+    calls, _ = synthetic.options(20)
+    return Butterfly.explorator(list(calls.values()), 250)[:5]
+
+
+@pytest.mark.parametrize('n_paths', [0, -10])
+def test_no_path(strategies, n_paths):
+    with pytest.raises(Exception, match='n_paths'):
+        simulate(strategies, 5000, T=30 / 365, sigma=0.2, n_paths=n_paths)
+
+
+def test_seed(strategies):
+    first = simulate(strategies, 5000, T=30 / 365, sigma=0.2, n_paths=5000, seed=1)
+    second = simulate(strategies, 5000, T=30 / 365, sigma=0.2, n_paths=5000, seed=1)
+    assert (first['expected'] == second['expected']).all()
@@ -0,0 +1,25 @@
+import pytest
+
+from benchmarks import synthetic
+from scanner import Scanner
+
+
+@pytest.fixture(scope='module')
+def scanner():
+    return Scanner(synthetic.chain(60))
+
+
+def labels(candidates):
+    return [(c.label, c.score) for c in candidates]
+
+
+@pytest.mark.parametrize('key', ['ratio', 'max_profit', 'max_loss', 'cost'])
+@pytest.mark.parametrize('k', [1, 5, 20])
+def test_top_prune_same_as_no_prune(scanner, key, k):
+    assert labels(scanner.top(k, key=key)) == labels(scanner.top(k, key=key, prune=False))
+
+
+def test_top_call_spread(scanner):
+    best = scanner.top(5, families=['call_spread'])
+    assert labels(best) == labels(scanner.top(5, families=['call_spread'], prune=False))
+    assert [round(c.score) for c in best] == [1272, 1156, 1041, 949, 925]
@@ -0,0 +1,30 @@
+from datetime import datetime
+
+import pytest
+
+import screen
+from benchmarks import synthetic
+from euronext import Page, Ticker
+from store import SnapshotStore
+
+
+def test_missing_snapshot_skipped(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    store.write(synthetic.chain(10), 'CACPXA', '2018-03', datetime(2018, 1, 3))
+    with pytest.warns(UserWarning, match='CACPXA 2018-06 skipped: no snapshot'):
+        results = screen.screen([Ticker.CACPXA], ['2018-06', '2018-03'], families=['call_spread'],
+                                top=2, workers=1, store=str(tmp_path))
+    assert [r['expiry'] for r in results] == ['2018-03', '2018-03']
+
+
+def test_failed_page_skipped(monkeypatch):
+    def fetch(page, timeout=None):
+        if page.ticker == Ticker.CAC1PX.value:
+            raise ConnectionError('timed out')
+        page.load(synthetic.page_html(20, filler=0))
+
+    monkeypatch.setattr(Page, 'fetch', fetch)
+    with pytest.warns(UserWarning, match='CAC1PX nearest skipped: timed out'):
+        results = screen.screen([Ticker.CACPXA, Ticker.CAC1PX], families=['call_spread'],
+                                top=2, workers=1)
+    assert [r['ticker'] for r in results] == ['CACPXA', 'CACPXA']
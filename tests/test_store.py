@@ -0,0 +1,16 @@
+from datetime import datetime
+
+import numpy as np
+
+from benchmarks import synthetic
+from store import SnapshotStore
+
+
+def test_read_nearest_with_dated_expiries(tmp_path):
+    store = SnapshotStore(str(tmp_path))
+    nearest, dated = synthetic.chain(10), synthetic.chain(20)
+    store.write(nearest, 'CACPXA', None, datetime(2018, 1, 2))
+    store.write(dated, 'CACPXA', '2018-03', datetime(2018, 1, 3))
+    assert np.array_equal(store.read('CACPXA').strike, nearest.strike)
+    assert np.array_equal(store.read('CACPXA', '2018-03').strike, dated.strike)
+    assert len(store.snapshots('CACPXA')) == 2
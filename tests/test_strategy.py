@@ -0,0 +1,35 @@
+import pytest
+
+from product import Option
+from strategy import BoxSpread, Butterfly, CallSpread, PutSpread, RatioSpread
+
+
+def options(cat):
+    return {4800 + 25 * i: Option(cat, strike=4800 + 25 * i, achat=10, vente=9) for i in range(20)}
+
+
+def strikes(boxes):
+    return [[option.strike for option, _, _ in box.legs()] for box in boxes]
+
+
+def test_box_spread():
+    boxes = BoxSpread.explorator(list(options('Call').values()), list(options('Put').values()),
+                                 spread=50, gap=100)
+    assert strikes(boxes)[:2] == [[4825, 4800, 4925, 4950], [4850, 4825, 4950, 4975]]
+    assert all([option.cat for option, _, _ in box.legs()] == ['Call', 'Call', 'Put', 'Put']
+               for box in boxes)
+
+
+@pytest.mark.parametrize('explore', [
+    lambda calls, puts: CallSpread.explorator(calls, step=50),
+    lambda calls, puts: PutSpread.explorator(puts, step=50),
+    lambda calls, puts: RatioSpread.explorator(calls, step=50),
+    lambda calls, puts: Butterfly.explorator(calls, step=50),
+    lambda calls, puts: BoxSpread.explorator(calls, puts, spread=50, gap=100),
+])
+def test_explorator_dict_values(explore):
+    calls, puts = options('Call'), options('Put')
+    found = explore(calls.values(), puts.values())
+    assert found
+    assert [s.label for s in found] == [s.label for s in explore(list(calls.values()),
+                                                                 list(puts.values()))]
@@ -0,0 +1,19 @@
+import numpy as np
+
+from pricing import black_scholes
+from volatility import implied_volatility
+
+
+def test_scalar():
+    price = black_scholes(1, 100, 100, 0.25, 0.0, 0.3)['price']
+    sigma, converged = implied_volatility(price, 1, 100, 100, 0.25)
+    assert sigma.shape == () and converged
+    assert abs(float(sigma) - 0.3) < 1e-6
+
+
+def test_grid():
+    strike = np.array([[90.0, 100.0], [110.0, 120.0]])
+    price = black_scholes(-1, 100, strike, 0.5, 0.01, 0.25)['price']
+    sigma, converged = implied_volatility(price, -1, 100, strike, 0.5, 0.01)
+    assert sigma.shape == (2, 2) and converged.all()
+    assert np.allclose(sigma, 0.25)
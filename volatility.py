@@ -0,0 +1,118 @@
+import numpy as np
+
+from chain import CALL
+from pricing import black_scholes
+
+SIGMA_MIN = 1e-4
+SIGMA_MAX = 5.0
+
+
+def _quote(chain, quote):
+    """Price to invert for every option: 'mid', 'bid' (vente) or 'ask' (achat).
+    With 'mid', an option quoted on one side only uses that side.
+    """
+    if quote == 'bid':
+        return chain.vente
+    elif quote == 'ask':
+        return chain.achat
+    elif quote == 'mid':
+        mid = (chain.vente + chain.achat) / 2
+        return np.where(np.isnan(mid), np.where(np.isnan(chain.vente), chain.achat, chain.vente), mid)
+    raise Exception('quote "{}" is not good'.format(quote))
+
+
+def _initial_guess(price, w, S, K, T, r, q):
+    """Corrado-Miller approximation, puts converted to calls by parity"""
+    spot = S * np.exp(-q * T)
+    strike = K * np.exp(-r * T)
+    call = np.where(w > 0, price, price + spot - strike)
+    half = call - (spot - strike) / 2
+    with np.errstate(invalid='ignore'):
+        root = np.sqrt(np.maximum(half * half - (spot - strike) ** 2 / np.pi, 0))
+        sigma = np.sqrt(2 * np.pi / T) / (spot + strike) * (half + root)
+    return np.clip(np.where(np.isfinite(sigma), sigma, 0.2), 0.01, 3.0)
+
+
+def implied_volatility(price, w, S, K, T, r=0.0, q=0.0, tol=1e-8, max_iter=100):
+    """Implied volatility of European options, all solved at once.
+
+    Newton steps on vega inside a bracket [SIGMA_MIN, SIGMA_MAX] narrowed at
+    every iteration, with a bisection step when Newton leaves the bracket or
+    vega vanishes. Only the options not yet converged are iterated.
+
+    :param: price option prices, NaN for missing quotes
+    :param: w +1 for a call, -1 for a put
+
+    Return (sigma, converged) with the broadcast shape of the inputs: sigma is
+    NaN for missing quotes and for prices out of the no-arbitrage bounds,
+    converged tells where |price error| < tol.
+    """
+    inputs = np.broadcast_arrays(price, w, S, K, T, r, q)
+    shape = inputs[0].shape
+    # à plat, un scalaire ou une grille se résout comme un vecteur
+    price, w, S, K, T, r, q = (np.array(v, dtype=float).ravel() for v in inputs)
+    spot = S * np.exp(-q * T)
+    strike = K * np.exp(-r * T)
+    lower = np.maximum(w * (spot - strike), 0)
+    upper = np.where(w > 0, spot, strike)
+    valid = np.isfinite(price) & (T > 0) & (price > lower) & (price < upper)
+    sigma = np.full(price.shape, np.nan)
+    converged = np.zeros(price.shape, dtype=bool)
+    active = np.flatnonzero(valid)
+    sigma[active] = _initial_guess(price[active], w[active], S[active], K[active],
+                                   T[active], r[active], q[active])
+    low = np.full(len(active), SIGMA_MIN)
+    high = np.full(len(active), SIGMA_MAX)
+    for _ in range(max_iter):
+        if not len(active):
+            break
+        s = sigma[active]
+        greeks = black_scholes(w[active], S[active], K[active], T[active], r[active], s, q[active])
+        error = greeks['price'] - price[active]
+        done = np.abs(error) < tol
+        converged[active[done]] = True
+        low = np.where(error < 0, s, low)
+        high = np.where(error > 0, s, high)
+        vega = greeks['vega']
+        with np.errstate(divide='ignore', invalid='ignore'):
+            newton = s - error / vega
+        bisect = (vega < 1e-12) | ~(newton > low) | ~(newton < high)
+        sigma[active] = np.where(done, s, np.where(bisect, (low + high) / 2, newton))
+        keep = ~done
+        active, low, high = active[keep], low[keep], high[keep]
+    return sigma.reshape(shape), converged.reshape(shape)
+
+
+def chain_volatility(chain, underlying, T, r=0.0, q=0.0, quote='mid', **kwargs):
+    """Implied volatility of every option of an `OptionChain`, see
+    `implied_volatility`. Use `Page.scrap_chain(partial=True)` to also solve
+    the options quoted on one side only.
+    """
+    return implied_volatility(_quote(chain, quote), chain.sign, underlying,
+                              chain.strike, T, r, q, **kwargs)
+
+
+def smile(chain, underlying, T, r=0.0, q=0.0, quote='mid'):
+    """Volatility smile of the chain of one expiry, from the out of the money
+    options: puts below the forward, calls above. Return a dict of arrays
+    sorted by strike: strike, iv, cat
+    """
+    forward = underlying * np.exp((r - q) * T)
+    sigma, converged = chain_volatility(chain, underlying, T, r, q, quote)
+    otm = np.where(chain.cat == CALL, chain.strike >= forward, chain.strike < forward)
+    keep = np.flatnonzero(otm & converged)
+    keep = keep[np.argsort(chain.strike[keep], kind='stable')]
+    return {'strike': chain.strike[keep],
+            'iv': sigma[keep],
+            'cat': chain.cat[keep],
+            }
+
+
+def atm_volatility(smile, price):
+    """Volatility of the smile interpolated at price, in percent as
+    `analyse.deviation` expects it
+
+    >>> s = smile(page.scrap_chain(partial=True), 5000, 30 / 365, 0.01)
+    >>> deviation(close=5000, volatility=atm_volatility(s, 5000), period=5)
+    """
+    return float(np.interp(price, smile['strike'], smile['iv'])) * 100